@@ -0,0 +1,119 @@
+import sys
+import glob
+import timeit
+import statistics
+import regex as re
+from extract import extract_voters
+from ocr_cache import CACHE_DIR
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Raw Tesseract text recorded by the OCR cache, else the bundled sample page
+DEFAULT_INPUTS = [f"{CACHE_DIR}/**/*.txt", "samples/ocr_page.txt"]
+
+# Each parser is timed REPEATS times over NUMBER passes of the corpus and
+# the median is reported, so one noisy run cannot decide the result
+REPEATS = 50
+NUMBER = 20
+
+# ----------------------------
+# PREVIOUS IMPLEMENTATION
+# ----------------------------
+
+# The line-by-line parser extract_voters() replaced, extended with the old
+# name/relation/house_no patterns so both sides fill the same fields
+def legacy_extract_voters(text):
+    voters = []
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+
+    current = None
+
+    for line in lines:
+        vid = re.search(r"(IKU|LPN)\d+", line)
+        if vid:
+            if current:
+                voters.append(current)
+            current = {"voter_id": vid.group(), "name": None, "relation": None, "house_no": None,
+                       "age": None, "gender": None}
+            continue
+
+        if not current:
+            continue
+
+        if "பெயர்" in line:
+            relation = re.search(r"(தந்தை|கணவர்|தாய்|இதரர்)\S*\s*பெயர்\s*[:\-]\s*(.+)", line)
+            if relation:
+                current["relation"] = relation.group(2).strip()
+            else:
+                name = re.search(r"பெயர்\s*[:\-]\s*(.+)", line)
+                if name:
+                    current["name"] = name.group(1).strip()
+
+        if "வீட்டு" in line:
+            house = re.search(r"வீட்டு\s*எண்\s*[:\-]\s*(\S+)", line)
+            if house:
+                current["house_no"] = house.group(1)
+
+        if "வயது" in line:
+            age = re.search(r"\d{2}", line)
+            if age:
+                current["age"] = age.group()
+
+        if "பாலினம்" in line:
+            if "பெண்" in line:
+                current["gender"] = "பெண்"
+            elif "ஆண்" in line:
+                current["gender"] = "ஆண்"
+
+    if current:
+        voters.append(current)
+
+    return voters
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+
+def load_texts(patterns):
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern, recursive=True))
+        if paths:
+            return pattern, [open(p, encoding="utf-8").read() for p in paths]
+    return None, []
+
+
+def lines_per_second(parse, texts, total_lines):
+    # Median of REPEATS timings, each NUMBER passes over the corpus
+    timings = timeit.repeat(lambda: [parse(text) for text in texts], number=NUMBER, repeat=REPEATS)
+    return NUMBER * total_lines / statistics.median(timings)
+
+
+def filled_fields(voters):
+    return sum(1 for v in voters for value in v.values() if value is not None)
+
+
+def main(patterns):
+    source, texts = load_texts(patterns)
+    if not texts:
+        print("[!] No OCR text found")
+        return
+
+    total_lines = sum(len(t.splitlines()) for t in texts)
+    print(f"[*] {len(texts)} page(s), {total_lines} lines from {source} "
+          f"(median of {REPEATS} x {NUMBER} passes, {re.__name__} engine)")
+
+    results = {}
+    for label, parse in (("legacy", legacy_extract_voters), ("single-pass", extract_voters)):
+        rate = lines_per_second(parse, texts, total_lines)
+        voters = [v for text in texts for v in parse(text)]
+        results[label] = rate
+        print(f"    {label:<12} {rate:>12,.0f} lines/sec  "
+              f"{len(voters)} voters, {filled_fields(voters)} fields filled")
+
+    print(f"[✓] Speedup: {results['single-pass'] / results['legacy']:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_INPUTS)
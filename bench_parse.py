@@ -0,0 +1,71 @@
+import sys
+import glob
+import time
+from eci_scraper import BASE_URL, ELECTION_FIELDS, parse_listing_page_soup
+from listing_parser import parse_listing_rows
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Pages saved with `eci_scraper.py --save-html DIR`, else the bundled sample page
+DEFAULT_INPUTS = ["listing_html/*.html", "samples/listing_page.html"]
+
+REPEAT = 5
+MIN_SECONDS = 0.5
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+
+def load_pages(patterns):
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern))
+        if paths:
+            return pattern, [open(p, encoding="utf-8").read() for p in paths]
+    return None, []
+
+
+def ms_per_page(parse, pages):
+    # Best of REPEAT runs, each looping over the pages for at least MIN_SECONDS
+    best = float("inf")
+    for _ in range(REPEAT):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            for html in pages:
+                parse(html)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_SECONDS:
+                break
+        best = min(best, elapsed * 1000 / (loops * len(pages)))
+    return best
+
+
+def main(patterns):
+    source, pages = load_pages(patterns)
+    if not pages:
+        print("[!] No listing pages found")
+        return
+
+    print(f"[*] {len(pages)} page(s) from {source}")
+
+    parsers = (
+        ("soup", lambda html: parse_listing_page_soup(html, BASE_URL)),
+        ("selectolax", lambda html: parse_listing_rows(html, BASE_URL, ELECTION_FIELDS)),
+    )
+    results = {}
+    outputs = {}
+    for label, parse in parsers:
+        results[label] = ms_per_page(parse, pages)
+        outputs[label] = [c for html in pages for c in parse(html) or []]
+        print(f"    {label:<12} {results[label]:>8.3f} ms/page  {len(outputs[label])} candidates")
+
+    if outputs["soup"] != outputs["selectolax"]:
+        print("[!] Parsers disagree on these pages")
+    print(f"[✓] Speedup: {results['soup'] / results['selectolax']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_INPUTS)
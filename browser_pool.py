@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+POOL_SIZE = 4
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# Playwright resource types never needed to read the listing HTML
+BLOCKED_RESOURCES = {"image", "font", "stylesheet", "media"}
+
+# ----------------------------
+# WARM BROWSER POOL
+# ----------------------------
+
+class BrowserPool:
+    """One Chromium process with `size` warm contexts, each holding an open page.
+
+    Scrapes borrow a page with `async with pool.page() as page:` and hand it
+    back afterwards, so every election/state filter in the process reuses the
+    same browsers instead of cold-starting one per scrape.
+    """
+
+    def __init__(self, size=POOL_SIZE, headless=True, blocked=BLOCKED_RESOURCES):
+        self.size = size
+        self.headless = headless
+        self.blocked = set(blocked)
+        self._playwright = None
+        self._browser = None
+        self._contexts = []
+        self._idle = asyncio.Queue()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless, args=["--no-sandbox", "--disable-dev-shm-usage"])
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_page())
+        return self
+
+    async def _new_page(self, context=None):
+        if context is None:
+            context = await self._browser.new_context(user_agent=USER_AGENT,
+                                                      viewport={"width": 1920, "height": 1080})
+            await context.route("**/*", self._route)
+            self._contexts.append(context)
+        return await context.new_page()
+
+    async def _replace(self, page):
+        # A page that crashed or timed out mid-navigation cannot be trusted
+        # with the next borrower: close it and open a fresh one, in a new
+        # context if its own has gone too
+        context = page.context
+        try:
+            if not page.is_closed():
+                await page.close()
+            return await self._new_page(context)
+        except Exception:
+            if context in self._contexts:
+                self._contexts.remove(context)
+            return await self._new_page()
+
+    async def _route(self, route):
+        if route.request.resource_type in self.blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self._idle.get()
+        failed = False
+        try:
+            yield page
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if failed or page.is_closed():
+                # On failure the old page goes back, so the slot is never lost
+                try:
+                    page = await self._replace(page)
+                finally:
+                    self._idle.put_nowait(page)
+            else:
+                self._idle.put_nowait(page)
+
+    async def close(self):
+        for context in self._contexts:
+            await context.close()
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,49 @@
+import os
+import csv
+import sys
+import tempfile
+from load_voters import iter_copy_rows, COPY_COLUMNS
+from voter_dataset import source_stem
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Batch CSVs for this many rolls are written under different directories, so
+# their source_stem() hashes cover digit-only and digit-ending cases too
+ROLLS = 500
+PART_NO = COPY_COLUMNS.index("part_no")
+FIELDS = ["voter_id", "name", "relation", "house_no", "age", "gender"]
+
+
+def write_batch_csv(out_dir, pdf_path):
+    # Named exactly as extract.py --batch names it
+    csv_path = os.path.join(out_dir, source_stem(pdf_path) + ".csv")
+    with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerow({"voter_id": "IKU1234567", "name": "N", "age": "30"})
+    return csv_path
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as out_dir:
+        for i in range(ROLLS):
+            part = str(i % 300 + 1)
+            pdf_path = os.path.join(f"rolls/ac{i}", f"2026-EROLLGEN-S22-{i % 234 + 1}-TAM-{part}-WI.pdf")
+            csv_path = write_batch_csv(out_dir, pdf_path)
+            loaded = {row[PART_NO] for row in iter_copy_rows(1, csv_path)}
+            if loaded != {part}:
+                failures += 1
+                print(f"[!] {os.path.basename(csv_path)} loaded as part {loaded}, expected {part}")
+
+    if failures:
+        print(f"[!] {failures} of {ROLLS} batch CSVs loaded with the wrong part_no")
+        return 1
+    print(f"[✓] All {ROLLS} batch CSVs loaded with their roll's part_no")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import sys
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from database import Alliance, Party, AllianceParty, Constituency, Candidate
+from listing_queries import candidate_listing, alliance_members
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Each listing is rendered at these sizes; the query count must not change
+ROW_COUNTS = [3, 30]
+TABLES = [Alliance, Party, AllianceParty, Constituency, Candidate]
+
+# ----------------------------
+# QUERY COUNTER
+# ----------------------------
+
+@contextmanager
+def count_queries(engine):
+    """Counts SQL statements executed on engine inside the block."""
+    counter = {"queries": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+# ----------------------------
+# FIXTURES AND PAGE RENDERS
+# ----------------------------
+
+def seed(db, rows):
+    alliance = Alliance(name="A", election_type="state", year=2026)
+    db.add(alliance)
+    for i in range(rows):
+        party = Party(name=f"P{i}", full_name=f"Party {i}", alliance=alliance)
+        const = Constituency(name=f"C{i}", state="Tamil Nadu", district=f"D{i % 5}")
+        db.add_all([party, const,
+                    AllianceParty(alliance=alliance, party=party, seats_sharing_tn=i),
+                    Candidate(name=f"Cand {i}", party=party, alliance=alliance, constituency_rel=const)])
+    db.commit()
+    return alliance.id
+
+
+def render_candidates(db):
+    # Touches what each candidate card in app.py shows
+    for cand in candidate_listing(db).filter(Constituency.state == "Tamil Nadu").all():
+        _ = (cand.party.name, cand.alliance.name, cand.constituency_rel.state,
+             cand.constituency_rel.district, cand.constituency_rel.name)
+
+
+def render_alliance_members(db, alliance_id):
+    # Touches what each member row on the alliance detail page shows
+    for m in alliance_members(db, alliance_id).all():
+        _ = (m.party.full_name, m.party.name, m.seats_sharing_tn, m.symbol_image_url)
+
+
+def queries_per_page(rows):
+    engine = create_engine("sqlite://")
+    for model in TABLES:
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        alliance_id = seed(db, rows)
+
+    counts = {}
+    for page, render in (("candidates", render_candidates),
+                         ("alliance members", lambda db: render_alliance_members(db, alliance_id))):
+        # A fresh session per page, like a rerun: nothing already in the identity map
+        with Session() as db, count_queries(engine) as counter:
+            render(db)
+        counts[page] = counter["queries"]
+    return counts
+
+
+def main():
+    results = {rows: queries_per_page(rows) for rows in ROW_COUNTS}
+    failed = False
+    for page in results[ROW_COUNTS[0]]:
+        counts = [results[rows][page] for rows in ROW_COUNTS]
+        constant = len(set(counts)) == 1
+        failed |= not constant
+        detail = ", ".join(f"{rows} rows: {n}" for rows, n in zip(ROW_COUNTS, counts))
+        print(f"[{'✓' if constant else '!'}] {page:<17} {detail} queries")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
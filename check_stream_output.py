@@ -0,0 +1,67 @@
+import os
+import sys
+import random
+import asyncio
+import tempfile
+from eci_scraper import _collect_pages
+from ndjson_sink import NDJSONSink, compact
+from scrape_state import ScrapeState
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Candidates on each listing page; page 5 comes back empty, so it and every
+# page after it must stay out of both the results and the stream
+PAGE_SIZES = [25, 25, 25, 25, 0, 25, 25]
+CONCURRENCY = 4
+ROUNDS = 20
+
+# ----------------------------
+# FAKE LISTING
+# ----------------------------
+
+def make_fetch_page(last_page):
+    """A fetch_page that finishes pages in random order, like the live site."""
+    first_html = f'<ul class="pagination"><li><a href="?page={last_page}">{last_page}</a></li></ul>' if last_page else ""
+
+    async def fetch_page(page_num):
+        await asyncio.sleep(random.uniform(0, 0.01))
+        size = PAGE_SIZES[page_num - 1] if page_num <= len(PAGE_SIZES) else 0
+        candidates = [{"state": "TN", "constituency": f"C{page_num}", "party": "P", "name": f"N{page_num}-{i}"}
+                      for i in range(size)]
+        return candidates, first_html if page_num == 1 else "", False
+
+    return fetch_page
+
+
+def run_round(tmp, last_page):
+    stream = os.path.join(tmp, "stream.ndjson")
+    with NDJSONSink(stream) as sink:
+        results = asyncio.run(_collect_pages(make_fetch_page(last_page), CONCURRENCY,
+                                             ScrapeState(os.path.join(tmp, "state.json")), sink))
+    return results, compact(stream, os.path.join(tmp, "out.json"))
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        # With pagination links every page is fetched at once; without them
+        # pages are walked a batch at a time
+        for last_page in (len(PAGE_SIZES), None):
+            for _ in range(ROUNDS):
+                results, compacted = run_round(tmp, last_page)
+                if compacted != results:
+                    failures += 1
+                    print(f"[!] last_page={last_page}: stream has {len(compacted)} records, "
+                          f"results have {len(results)}")
+
+    if failures:
+        print(f"[!] {failures} rounds wrote a stream that differs from the returned results")
+        return 1
+    print(f"[✓] Compacted stream matched the returned results in {2 * ROUNDS} rounds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, Float, Boolean
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, Index, Column, Integer, BigInteger, SmallInteger, String, ForeignKey, Text, Float, Boolean, PrimaryKeyConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from passlib.context import CryptContext
+from migrations import run_migrations
 
 # Database Configuration
 # You should set these environment variables or change them here
@@ -14,7 +16,22 @@ DB_NAME = os.getenv("DB_NAME", "neondb")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+# Connection pool; Neon drops idle connections, so stale ones are pinged
+# before use and recycled well inside its idle timeout
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -102,6 +119,26 @@ class Constituency(Base):
     third_gender_voters = Column(Integer, default=0)
     type = Column(String, default="General") # 'General' or 'Reserved'
 
+class Voter(Base):
+    # Electoral roll rows loaded from extract.py output (see load_voters.py).
+    # List-partitioned by constituency; one partition per constituency is
+    # created on first load, so the partition key is part of the primary key.
+    __tablename__ = "voters"
+    __table_args__ = (
+        PrimaryKeyConstraint("constituency_id", "id"),
+        {"postgresql_partition_by": "LIST (constituency_id)"},
+    )
+    id = Column(BigInteger, autoincrement=True)
+    constituency_id = Column(Integer, ForeignKey("constituencies.id"), nullable=False)
+    part_no = Column(Integer)
+    voter_id = Column(String, index=True)
+    name = Column(String)
+    relation = Column(String)
+    house_no = Column(String)
+    age = Column(SmallInteger)
+    gender = Column(String) # 'Male', 'Female', 'Other'
+    source = Column(String) # Roll PDF the row was extracted from
+
 class Candidate(Base):
     __tablename__ = "candidates"
     id = Column(Integer, primary_key=True, index=True)
@@ -156,12 +193,20 @@ class OpinionPollOption(Base):
     name = Column(String) # Party or Alliance Name
     symbol_image_url = Column(String)
     color = Column(String, default="#00d4ff")
+    # Denormalized count of poll_votes for this option, bumped in the same
+    # transaction as each vote insert (see polls.cast_vote)
+    vote_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     poll = relationship("OpinionPoll", back_populates="options")
     votes = relationship("PollVote", back_populates="option", cascade="all, delete-orphan")
 
 class PollVote(Base):
     __tablename__ = "poll_votes"
+    # One vote per IP per poll, enforced by the index polls.cast_vote conflicts on
+    __table_args__ = (
+        Index("ix_poll_votes_poll_ip", "poll_id", "ip_address", unique=True),
+        Index("ix_poll_votes_option_id", "option_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     poll_id = Column(Integer, ForeignKey("opinion_polls.id"))
     option_id = Column(Integer, ForeignKey("opinion_poll_options.id"))
@@ -172,6 +217,7 @@ class PollVote(Base):
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 def get_db():
     db = SessionLocal()
@@ -180,6 +226,48 @@ def get_db():
     finally:
         db.close()
 
+@contextmanager
+def session_scope():
+    """One session per Streamlit rerun: rolled back on any exit that is not
+    a normal one (including st.rerun()/st.stop()) and always closed, so its
+    connection goes back to the pool."""
+    db = SessionLocal()
+    try:
+        yield db
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# --- Pool metrics ---
+POOL_METRICS = {"connects": 0, "checkouts": 0, "checkins": 0, "peak_checked_out": 0}
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_conn, conn_record):
+    POOL_METRICS["connects"] += 1
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+    POOL_METRICS["checkouts"] += 1
+    POOL_METRICS["peak_checked_out"] = max(POOL_METRICS["peak_checked_out"], engine.pool.checkedout())
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_conn, conn_record):
+    POOL_METRICS["checkins"] += 1
+
+def pool_status():
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size until the pool is full
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        **POOL_METRICS,
+    }
+
 def hash_password(password):
     return pwd_context.hash(password)
 
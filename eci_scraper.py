@@ -1,7 +1,12 @@
+import os
 import json
 import time
 import random
 import re
+import asyncio
+import argparse
+from urllib.parse import urlencode, urlsplit
+import aiohttp
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -10,8 +15,152 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from playwright.async_api import Error as PlaywrightError
+from browser_pool import BrowserPool, POOL_SIZE
+from listing_parser import parse_listing_rows
+from scrape_state import (ScrapeState, STATE_FILE, DELTA_FILE, page_fingerprint, candidate_key,
+                          candidate_index, diff_candidates)
+from ndjson_sink import NDJSONSink, compact
 
-def scrape_eci_selenium():
+BASE_URL = "https://affidavit.eci.gov.in"
+LISTING_PATH = "/CandidateCustomFilter"
+LISTING_PARAMS = {
+    "electionType": "32-AC-GENERAL-3-60",
+    "election": "32-AC-GENERAL-3-60",
+    "states": "U07",
+    "submitName": "100",
+}
+
+# Added to every scraped candidate
+ELECTION_FIELDS = {"years": 2026, "Election": "Assembely election"}
+
+# Async mode: simultaneous requests, and requests per second to any one host
+ASYNC_CONCURRENCY = 8
+ASYNC_RATE = 2.0
+FETCH_RETRIES = 3
+
+
+def listing_url(page, base_url=BASE_URL, params=LISTING_PARAMS):
+    return f"{base_url}{LISTING_PATH}?{urlencode({**params, 'page': page})}"
+
+
+def save_listing_page(save_dir, page_num, html):
+    # Saved pages can be served back by fixture_server.py
+    os.makedirs(save_dir, exist_ok=True)
+    with open(os.path.join(save_dir, f"page_{page_num}.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def parse_listing_page(html, base_url=BASE_URL, extra=ELECTION_FIELDS):
+    """Return the unique candidates on a listing page, or None if it has no candidate rows.
+
+    extra (election metadata) is added to every candidate.
+    """
+    candidates = parse_listing_rows(html, base_url, extra)
+    if candidates is None:
+        # Unexpected layout: fall back to the lenient text-scanning parser
+        candidates = parse_listing_page_soup(html, base_url, extra)
+    return candidates
+
+
+def parse_listing_page_soup(html, base_url=BASE_URL, extra=ELECTION_FIELDS):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Identify rows - could be inside a table or card grid
+    rows = soup.select("#data-tab tbody tr")
+    if not rows:
+         # Fallback: check for .card blocks
+         rows = soup.select(".card")
+
+    if not rows:
+        # Try finding any row containing "Party :"
+        rows = [el for el in soup.find_all(True) if "Party :" in el.get_text() and el.name in ['div', 'tr']]
+
+    if not rows:
+        return None
+
+    page_results = []
+    for row in rows:
+        text = row.get_text(separator=' ', strip=True)
+        # Skip noise or headers
+        if "LIST OF CANDIDATES" in text or len(text) < 50:
+            continue
+
+        # Candidate name is often in h4.bg-blu or a similar header
+        name_el = row.select_one("h4.bg-blu")
+        if not name_el:
+            name_el = row.select_one("h1, h2, h3, h4, h5, b, strong")
+
+        name = name_el.get_text(strip=True) if name_el else "N/A"
+
+        # Additional cleanup for name if it picks up page titles
+        if name == "N/A" or name.lower().startswith("election") or name.lower() == "list of candidates":
+            # Find the longest line in the row text before "Party :" as a fallback
+            parts = text.split("Party :")
+            if parts:
+                name_parts = parts[0].split("\n")
+                name = max(name_parts, key=len).strip() if name_parts else "N/A"
+
+        if name == "N/A" or "Election" in name:
+            continue
+
+        def extract_val(label):
+            # Search for label followed by a colon and captured value
+            # Stop at common delimiters or the 'View more' button text
+            pattern = rf"{label}\s*:\s*(.*?)(?=\s*\||Party|Status|State|Constituency|View more|$|\n)"
+            match = re.search(pattern, text, re.IGNORECASE)
+            return match.group(1).strip() if match else "N/A"
+
+        view_more_link = row.select_one('a[href*="show-profile"]')
+
+        candidate_url = "N/A"
+        if view_more_link and 'href' in view_more_link.attrs:
+             href = view_more_link['href']
+             if href.startswith("/"):
+                 candidate_url = base_url + href
+             else:
+                 candidate_url = href
+
+        page_results.append({
+            "name": name,
+            "party": extract_val("Party"),
+            "state": extract_val("State"),
+            "status": extract_val("Status"),
+            "constituency": extract_val("Constituency"),
+            "view_more_link": candidate_url,
+            **extra,
+        })
+
+    # Deduplicate names on the same page
+    unique_page_results = []
+    seen_names = set()
+    for c in page_results:
+        if c['name'] not in seen_names and c['name'] != "N/A":
+            unique_page_results.append(c)
+            seen_names.add(c['name'])
+    return unique_page_results
+
+
+def parse_page(page_num, html, state=None, base_url=BASE_URL, etag=None, last_modified=None,
+               extra=ELECTION_FIELDS):
+    # With a previous run's state, an unchanged page reuses its stored candidates
+    fingerprint = page_fingerprint(html)
+    if state is not None and state.page_unchanged(page_num, fingerprint):
+        candidates = state.page_candidates(page_num)
+    else:
+        candidates = parse_listing_page(html, base_url, extra)
+    if state is not None:
+        state.record_page(page_num, fingerprint, candidates, etag, last_modified)
+    return candidates
+
+
+def last_page_number(html):
+    # Pagination links carry page=N; the largest one is the last page
+    pages = [int(n) for n in re.findall(r"[?&;]page=(\d+)", html)]
+    return max(pages) if pages else None
+
+
+def scrape_eci_selenium(save_dir=None, state=None, sink=None):
     # Setup selenium
     chrome_options = Options()
     chrome_options.add_argument("--headless")
@@ -34,7 +183,7 @@ def scrape_eci_selenium():
     results = []
     page_num = 1
     
-    target_url = "https://affidavit.eci.gov.in/CandidateCustomFilter?electionType=32-AC-GENERAL-3-60&election=32-AC-GENERAL-3-60&states=U07&submitName=100&page=1"
+    target_url = listing_url(1)
 
     print(f"Navigating to: {target_url}")
     try:
@@ -59,87 +208,19 @@ def scrape_eci_selenium():
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
         time.sleep(2)
 
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Identify rows - could be inside a table or card grid
-        rows = soup.select("#data-tab tbody tr")
-        if not rows:
-             # Fallback: check for .card blocks
-             rows = soup.select(".card")
-        
-        if not rows:
-            print(f"Attempting alternative layout for page {page_num}...")
-            # Try finding any row containing "Party :"
-            rows = [el for el in soup.find_all(True) if "Party :" in el.get_text() and el.name in ['div', 'tr']]
+        html = driver.page_source
+        if save_dir:
+            save_listing_page(save_dir, page_num, html)
 
-        if not rows:
+        unique_page_results = parse_page(page_num, html, state)
+        if unique_page_results is None:
             print("No candidate indicators found. Ending scrape.")
             break
-            
-        page_results = []
-        for row in rows:
-            text = row.get_text(separator=' ', strip=True)
-            # Skip noise or headers
-            if "LIST OF CANDIDATES" in text or len(text) < 50:
-                continue
-                
-            # Candidate name is often in h4.bg-blu or a similar header
-            name_el = row.select_one("h4.bg-blu")
-            if not name_el:
-                name_el = row.select_one("h1, h2, h3, h4, h5, b, strong")
-            
-            name = name_el.get_text(strip=True) if name_el else "N/A"
-            
-            # Additional cleanup for name if it picks up page titles
-            if name == "N/A" or name.lower().startswith("election") or name.lower() == "list of candidates":
-                # Find the longest line in the row text before "Party :" as a fallback
-                parts = text.split("Party :")
-                if parts:
-                    name_parts = parts[0].split("\n")
-                    name = max(name_parts, key=len).strip() if name_parts else "N/A"
-
-            if name == "N/A" or "Election" in name:
-                continue
-
-            def extract_val(label):
-                # Search for label followed by a colon and captured value 
-                # Stop at common delimiters or the 'View more' button text
-                pattern = rf"{label}\s*:\s*(.*?)(?=\s*\||Party|Status|State|Constituency|View more|$|\n)"
-                match = re.search(pattern, text, re.IGNORECASE)
-                return match.group(1).strip() if match else "N/A"
-
-            view_more_link = row.select_one('a[href*="show-profile"]')
-            
-            candidate_url = "N/A"
-            if view_more_link and 'href' in view_more_link.attrs:
-                 href = view_more_link['href']
-                 if href.startswith("/"):
-                     candidate_url = "https://affidavit.eci.gov.in" + href
-                 else:
-                     candidate_url = href
-
-            page_results.append({
-                "name": name,
-                "party": extract_val("Party"),
-                "state": extract_val("State"),
-                "status": extract_val("Status"),
-                "constituency": extract_val("Constituency"),
-                "view_more_link": candidate_url,
-                "years": 2026,
-                "Election": "Assembely election"
-            })
-        
-        # Deduplicate names on the same page
-        unique_page_results = []
-        seen_names = set()
-        for c in page_results:
-            if c['name'] not in seen_names and c['name'] != "N/A":
-                unique_page_results.append(c)
-                seen_names.add(c['name'])
 
         print(f"Found {len(unique_page_results)} unique candidates on page {page_num}.")
         results.extend(unique_page_results)
+        if sink is not None:
+            sink.extend(unique_page_results)
         
         # Pagination handling
         try:
@@ -184,16 +265,261 @@ def scrape_eci_selenium():
             break
 
     driver.quit()
+    if state is not None:
+        state.trim(page_num)
+    return results
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+async def fetch(session, url, limiter, semaphore, headers=None, retries=FETCH_RETRIES):
+    """Return (status, text, response headers); a 304 comes back with empty text."""
+    for attempt in range(retries + 1):
+        async with semaphore:
+            await limiter.wait(url)
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    # 429/5xx are worth retrying; other errors are not
+                    if resp.status == 429 or resp.status >= 500:
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history,
+                                                          status=resp.status, message=resp.reason)
+                    if resp.status == 304:
+                        return resp.status, "", resp.headers
+                    resp.raise_for_status()
+                    return resp.status, await resp.text(), resp.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == retries or (isinstance(e, aiohttp.ClientResponseError)
+                                          and e.status != 429 and e.status < 500):
+                    raise
+                print(f"Retrying {url} after error: {e}")
+        # Back off outside the semaphore so other pages keep flowing
+        await asyncio.sleep(2 ** attempt + random.uniform(0, 1))
+
+
+async def fetch_text(session, url, limiter, semaphore, retries=FETCH_RETRIES):
+    _, text, _ = await fetch(session, url, limiter, semaphore, retries=retries)
+    return text
+
+
+async def _collect_pages(fetch_page, concurrency, state, sink=None):
+    """Fetch page 1, then the rest of the listing; return candidates in page order.
+
+    fetch_page(n) returns (candidates, html, unchanged); html is None when the
+    page was not re-downloaded. Pages go to the sink in page order as soon as
+    every earlier page is in, stopping at the first empty one, so the stream
+    holds exactly the returned candidates.
+    """
+    fetched_pages = {}
+    emit = {"next": 1, "stopped": False}
+
+    async def scrape_page(page_num):
+        result = await fetch_page(page_num)
+        fetched_pages[page_num] = result[0]
+        while not emit["stopped"] and emit["next"] in fetched_pages:
+            candidates = fetched_pages.pop(emit["next"])
+            if not candidates:
+                emit["stopped"] = True
+            elif sink is not None:
+                sink.extend(candidates)
+            emit["next"] += 1
+        return result
+
+    candidates, first, unchanged = await scrape_page(1)
+    pages = {1: candidates}
+    unchanged_pages = int(unchanged)
+    # A 304 on page 1 means the pagination is unchanged too
+    last = last_page_number(first) if first is not None else state.last_page
+
+    if last:
+        fetched = await asyncio.gather(*(scrape_page(n) for n in range(2, last + 1)))
+        for page_num, (candidates, _, unchanged) in enumerate(fetched, start=2):
+            pages[page_num] = candidates
+            unchanged_pages += unchanged
+    else:
+        # No pagination links: walk ahead a batch at a time until a page comes back empty
+        page_num = 2
+        while pages[page_num - 1]:
+            batch = range(page_num, page_num + concurrency)
+            fetched = await asyncio.gather(*(scrape_page(n) for n in batch))
+            for n, (candidates, _, unchanged) in zip(batch, fetched):
+                pages[n] = candidates
+                unchanged_pages += unchanged
+            page_num += concurrency
+            if not all(pages[n] for n in batch):
+                break
+
+    results = []
+    last_found = 0
+    for page_num in sorted(pages):
+        if not pages[page_num]:
+            break
+        print(f"Found {len(pages[page_num])} unique candidates on page {page_num}.")
+        results.extend(pages[page_num])
+        last_found = page_num
+    if state is not None:
+        state.trim(last_found)
+        print(f"{unchanged_pages} of {len(pages)} pages unchanged since the last run.")
     return results
 
+
+def listing_session():
+    timeout = aiohttp.ClientTimeout(total=60)
+    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"}
+    return aiohttp.ClientSession(timeout=timeout, headers=headers)
+
+
+async def scrape_listing_async(session, limiter, semaphore, concurrency, base_url=BASE_URL,
+                               params=LISTING_PARAMS, save_dir=None, state=None, extra=ELECTION_FIELDS,
+                               sink=None):
+    """Scrape one election/state listing; semaphore bounds its requests in flight."""
+    async def scrape_page(page_num):
+        url = listing_url(page_num, base_url, params)
+        conditional = state.conditional_headers(page_num) if state is not None else None
+        try:
+            status, html, resp_headers = await fetch(session, url, limiter, semaphore, conditional)
+        except aiohttp.ClientResponseError as e:
+            # Past the last page some servers answer 404 rather than an empty listing
+            if e.status != 404:
+                raise
+            return None, "", False
+        if status == 304:
+            return state.page_candidates(page_num), None, True
+        if save_dir:
+            save_listing_page(save_dir, page_num, html)
+        unchanged = state is not None and state.page_unchanged(page_num, page_fingerprint(html))
+        candidates = parse_page(page_num, html, state, base_url,
+                                resp_headers.get("ETag"), resp_headers.get("Last-Modified"), extra)
+        return candidates, html, unchanged
+
+    return await _collect_pages(scrape_page, concurrency, state, sink)
+
+
+async def _scrape_eci_async(base_url, concurrency, rate, save_dir, state, sink):
+    async with listing_session() as session:
+        return await scrape_listing_async(session, HostRateLimiter(rate), asyncio.Semaphore(concurrency),
+                                          concurrency, base_url, LISTING_PARAMS, save_dir, state,
+                                          ELECTION_FIELDS, sink)
+
+
+def scrape_eci_async(base_url=BASE_URL, concurrency=ASYNC_CONCURRENCY, rate=ASYNC_RATE, save_dir=None, state=None,
+                     sink=None):
+    """Fetch listing pages directly by URL with a bounded pool instead of clicking Next.
+
+    base_url can point at a local fixture_server.py serving saved pages. With a
+    ScrapeState, requests are conditional and unchanged pages are not re-parsed.
+    """
+    print(f"Fetching {base_url} with {concurrency} concurrent requests at {rate}/s per host...")
+    return asyncio.run(_scrape_eci_async(base_url, concurrency, rate, save_dir, state, sink))
+
+
+async def scrape_listing_playwright(pool, limiter, base_url=BASE_URL, params=LISTING_PARAMS, save_dir=None,
+                                    state=None, extra=ELECTION_FIELDS, sink=None):
+    """Scrape one election/state listing with pages borrowed from a warm BrowserPool.
+
+    Every navigation waits on limiter, like the aiohttp fetches.
+    """
+    async def scrape_page(page_num):
+        url = listing_url(page_num, base_url, params)
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                async with pool.page() as page:
+                    await limiter.wait(url)
+                    resp = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                    if resp is not None and resp.status == 404:
+                        return None, "", False
+                    html = await page.content()
+                break
+            except PlaywrightError as e:
+                if attempt == FETCH_RETRIES:
+                    raise
+                print(f"Retrying {url} after error: {e}")
+                await asyncio.sleep(2 ** attempt + random.uniform(0, 1))
+        if save_dir:
+            save_listing_page(save_dir, page_num, html)
+        unchanged = state is not None and state.page_unchanged(page_num, page_fingerprint(html))
+        return parse_page(page_num, html, state, base_url, extra=extra), html, unchanged
+
+    return await _collect_pages(scrape_page, pool.size, state, sink)
+
+
+def scrape_eci_playwright(base_url=BASE_URL, pool_size=POOL_SIZE, rate=ASYNC_RATE, save_dir=None, state=None,
+                          sink=None):
+    """Render listing pages in pooled Playwright contexts with images, fonts and CSS blocked."""
+    async def run():
+        async with BrowserPool(pool_size) as pool:
+            return await scrape_listing_playwright(pool, HostRateLimiter(rate), base_url, LISTING_PARAMS,
+                                                   save_dir, state, ELECTION_FIELDS, sink)
+
+    print(f"Rendering {base_url} with {pool_size} warm browser contexts at {rate}/s per host...")
+    return asyncio.run(run())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape the ECI affidavit candidate listing")
+    parser.add_argument("--mode", choices=["selenium", "async", "playwright"], default="selenium",
+                        help="drive headless Chrome, fetch listing pages directly with aiohttp, "
+                             "or render them in a pool of warm Playwright contexts")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="site root for --mode async or playwright (e.g. a local fixture_server.py)")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_CONCURRENCY)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="browser contexts for --mode playwright")
+    parser.add_argument("--rate", type=float, default=ASYNC_RATE, help="max requests per second per host")
+    parser.add_argument("--save-html", help="also save every listing page's HTML to this directory")
+    parser.add_argument("--output", default="eci_candidates.json")
+    parser.add_argument("--stream", default="eci_candidates.ndjson",
+                        help="candidates are appended here as pages are parsed; tail it with ndjson_sink.tail()")
+    parser.add_argument("--parquet", help="also compact the stream into this Parquet file")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse unchanged pages from the last run and write a delta of what changed")
+    parser.add_argument("--state", default=STATE_FILE, help="per-page state kept between --incremental runs")
+    parser.add_argument("--delta", default=DELTA_FILE,
+                        help="where --incremental writes added, removed and status-changed candidates")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    print("Starting Selenium + BeautifulSoup ECI Scraper...")
-    scraped_data = scrape_eci_selenium()
+    args = parse_args()
+    state = ScrapeState.load(args.state) if args.incremental else None
+    previous = state.candidate_index() if state is not None else {}
+
+    with NDJSONSink(args.stream) as sink:
+        if args.mode == "async":
+            print("Starting async ECI Scraper...")
+            scraped_data = scrape_eci_async(args.base_url, args.concurrency, args.rate, args.save_html, state, sink)
+        elif args.mode == "playwright":
+            print("Starting Playwright ECI Scraper...")
+            scraped_data = scrape_eci_playwright(args.base_url, args.pool_size, args.rate, args.save_html, state, sink)
+        else:
+            print("Starting Selenium + BeautifulSoup ECI Scraper...")
+            scraped_data = scrape_eci_selenium(args.save_html, state, sink)
     
     if scraped_data:
-        output_file = "eci_candidates.json"
-        with open(output_file, "w", encoding='utf-8') as f:
-            json.dump(scraped_data, f, indent=4, ensure_ascii=False)
-        print(f"SUCCESS: Saved {len(scraped_data)} candidates to {output_file}")
+        output_file = args.output
+        # The stream already holds every candidate; compaction rewrites it atomically
+        saved = compact(args.stream, output_file, args.parquet, key=candidate_key)
+        print(f"SUCCESS: Saved {len(saved)} candidates to {output_file}")
+
+        if state is not None:
+            delta = diff_candidates(previous, candidate_index(scraped_data))
+            with open(args.delta, "w", encoding='utf-8') as f:
+                json.dump(delta, f, indent=4, ensure_ascii=False)
+            state.save()
+            print(f"Delta: {len(delta['added'])} added, {len(delta['removed'])} removed, "
+                  f"{len(delta['status_changed'])} status changed -> {args.delta}")
     else:
         print("FAILED: No data extracted.")
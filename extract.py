@@ -1,9 +1,24 @@
 import os
+import glob
+import argparse
+import cProfile
+import time
+import threading
+import importlib.util
+from functools import partial
+from multiprocessing import util as mp_util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import cv2
+import numpy as np
 import regex as re
-import pandas as pd
 import pytesseract
-from pdf2image import convert_from_path
+import pdfplumber
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
+from ocr_cache import OCRCache, CACHE_DIR, CACHE_MAX_BYTES
+from roll_job import RollJob
+from voter_dataset import VoterDatasetWriter, source_stem
+from pipeline_stats import StageTimer, build_report, cpu_seconds, format_summary, write_report
 
 # ----------------------------
 # CONFIGURATION
@@ -15,23 +30,88 @@ OUTPUT_CSV = "output.csv"       # Output file
 
 DPI = 300
 
+# Pages are first rendered at START_DPI and only re-rendered at DPI when the
+# low-resolution pass parses fewer voters than a full page holds
+START_DPI = 200
+EXPECTED_VOTERS_PER_PAGE = 30
+
+# Binarize, deskew and crop the page border before OCR
+PREPROCESS = True
+MAX_SKEW_DEGREES = 5
+
 # Change this path ONLY if Tesseract is not in PATH (Windows)
 # pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 OCR_LANG = "tam+eng"
+OCR_CONFIG = "--psm 6"
+
+# A cropped voter box is a single uniform block of text
+BOX_OCR_CONFIG = "--psm 6"
+
+# "tesserocr" keeps Tesseract loaded in-process, "pytesseract" runs the
+# tesseract binary per call; "auto" prefers tesserocr when it is installed
+OCR_BACKEND = "auto"
+
+# Number of OCR worker processes (1 = run serially in this process)
+WORKERS = os.cpu_count() or 1
+
+# Pages rendered per convert_from_path call in streaming mode; peak memory
+# is roughly WORKERS * RENDER_WINDOW rendered pages
+RENDER_WINDOW = 1
+
+# Split pages into voter boxes with OpenCV and OCR each box on its own
+SEGMENT_BOXES = False
+
+# Plausible size of one voter box as a fraction of the page (rolls are a
+# 3-column grid of roughly 10 rows); anything else is a header or noise
+BOX_MIN_WIDTH, BOX_MAX_WIDTH = 0.20, 0.45
+BOX_MIN_HEIGHT, BOX_MAX_HEIGHT = 0.04, 0.15
+
+# Use a page's embedded text layer instead of OCR when it parses cleanly:
+# at least this share of its records must carry a well-formed EPIC number
+# and every core field
+USE_TEXT_LAYER = True
+TEXT_LAYER_MIN_COMPLETE = 0.9
+
+# --batch: PDFs picked up from a directory, and where their outputs go
+BATCH_PATTERN = "*.pdf"
+BATCH_OUTPUT_DIR = "output"
+COMBINED_DATASET = "voters_parquet"
+
+# Per-stage timing report written at the end of every run
+REPORT_JSON = "extract_report.json"
+
+# Column order of the output CSV
+VOTER_FIELDS = ["voter_id", "name", "relation", "house_no", "age", "gender", "box_row", "box_col"]
 
 # ----------------------------
 # REGEX PATTERNS
 # ----------------------------
 
-patterns = {
-    "voter_id": re.compile(r"(IKU|LPN)\d+"),
-    "name": re.compile(r"பெயர்\s*[:\-]\s*(.+)"),
-    "relation": re.compile(r"(தந்தை|கணவர்)\s*பெயர்\s*[:\-]\s*(.+)"),
-    "age": re.compile(r"வயது\s*[:\-]\s*(\d+)"),
-    "gender": re.compile(r"பாலினம்\s*[:\-]\s*(\S+)"),
-    "house_no": re.compile(r"வீட்டு\s*எண்\s*[:\-]\s*(\d+)")
-}
+# One scanner for every token a roll page can hold: a voter ID, or a field
+# label together with its value. Every alternative starts with a literal so
+# the engine skips straight to candidate positions, and the whole page is
+# matched in a single findall() pass, so no match objects are built. The
+# relation labels ("தந்தையின் பெயர்") must come before the bare name label
+# they end with.
+_SEP = r"[\s:\-=.]*"
+_LABELS = r"IKU|LPN|தந்தை|கணவர்|தாய்|இதரர்|பெயர்|வீட்டு|வயது|பாலினம்"
+# A free-text value runs to the end of the line, a "|" or the next label. The
+# label check only runs at characters a label can start with, not at every
+# character of the value; trailing spaces are stripped by the caller.
+_LABEL_STARTS = "ILதகஇபவ"
+_TEXT = rf"((?:[^\n|{_LABEL_STARTS}]+|(?!{_LABELS})[{_LABEL_STARTS}])*)"
+
+LINE_TOKENS = re.compile(
+    r"((?:IKU|LPN)\d+)"
+    rf"|(?:தந்தை|கணவர்|தாய்|இதரர்)\S*\s*பெயர்{_SEP}{_TEXT}"
+    rf"|பெயர்{_SEP}{_TEXT}"
+    rf"|வீட்டு\s*எண்{_SEP}(\d[\w/\-]*)?"
+    rf"|வயது{_SEP}(\d{{2,3}})?"
+    rf"|பாலினம்{_SEP}(பெண்|ஆண்|மூன்றாம்)?"
+)
+
+GENDERS = {"பெண்": "பெண்", "ஆண்": "ஆண்", "மூன்றாம்": "மூன்றாம் பாலினம்"}
 
 # ----------------------------
 # STEP 1: PDF → IMAGES
@@ -50,19 +130,332 @@ def pdf_to_images(pdf_path, img_dir):
     print(f"[✓] Converted {len(image_paths)} pages to images")
     return image_paths
 
+
+def pdf_page_count(pdf_path):
+    return pdfinfo_from_path(pdf_path)["Pages"]
+
+
+def pdf_page_id(pdf_path, page_no):
+    return f"{pdf_path} page {page_no}"
+
+
+def iter_pdf_windows(pdf_path, window=RENDER_WINDOW, page_numbers=None):
+    """Yield (pdf_path, first_page, last_page) runs of at most window pages.
+
+    Covers the whole PDF unless page_numbers restricts it (e.g. on resume).
+    """
+    if page_numbers is None:
+        page_numbers = range(1, pdf_page_count(pdf_path) + 1)
+
+    run = []
+    for page_no in page_numbers:
+        if run and (page_no != run[-1] + 1 or len(run) == window):
+            yield pdf_path, run[0], run[-1]
+            run = []
+        run.append(page_no)
+    if run:
+        yield pdf_path, run[0], run[-1]
+
+
+# pdfplumber document kept open per process; tasks arrive in PDF order so
+# one slot is enough and avoids re-parsing the xref for every window
+_text_pdf = (None, None)
+
+
+def extract_text_layer(pdf_path, page_no):
+    global _text_pdf
+    with _timer.stage("text_layer"):
+        path, doc = _text_pdf
+        if path != pdf_path:
+            if doc is not None:
+                doc.close()
+            doc = pdfplumber.open(pdf_path)
+            _text_pdf = (pdf_path, doc)
+        # The document stays open, so drop each page's parsed objects once
+        # its text is out or they pile up for the whole PDF
+        page = doc.pages[page_no - 1]
+        try:
+            return page.extract_text() or ""
+        finally:
+            page.close()
+
+
+def render_pages(pdf_path, first_page, last_page, dpi=DPI):
+    # Without output_folder pdf2image reads pdftoppm output from a pipe,
+    # so nothing is written to disk.
+    with _timer.stage("render"):
+        return convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+
 # ----------------------------
 # STEP 2: OCR IMAGE
 # ----------------------------
 
-def ocr_image(image_path):
-    img = Image.open(image_path)
-    text = pytesseract.image_to_string(
-        img,
-        lang=OCR_LANG,
-        config="--psm 6"
-    )
+class PytesseractBackend:
+    """Runs the tesseract binary for every image (reloads traineddata each call)."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        self._version = None
+
+    @property
+    def version(self):
+        # Asks the binary once per process
+        if self._version is None:
+            self._version = str(pytesseract.get_tesseract_version())
+        return self._version
+
+    def image_to_string(self, img, config):
+        return pytesseract.image_to_string(img, lang=OCR_LANG, config=config)
+
+
+class TesserocrBackend:
+    """Keeps a Tesseract engine loaded in this process via tesserocr.
+
+    The Tamil+English models load once per thread (box OCR threads each need
+    their own engine; the API is not thread-safe) and are reused for every
+    page. Only the --psm option of the config string is honoured.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang=OCR_LANG):
+        # Imported here, after the worker has set OMP_THREAD_LIMIT
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self._local = threading.local()
+        self.version = tesserocr.tesseract_version().splitlines()[0]
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self.lang)
+            self._local.api = api
+        return api
+
+    def image_to_string(self, img, config):
+        api = self._api()
+        psm = re.search(r"--psm\s+(\d+)", config)
+        api.SetPageSegMode(int(psm.group(1)) if psm else self._tesserocr.PSM.AUTO)
+        api.SetImage(img)
+        return api.GetUTF8Text()
+
+
+def make_ocr_backend(name=OCR_BACKEND):
+    if name == "auto":
+        name = "tesserocr" if importlib.util.find_spec("tesserocr") else "pytesseract"
+    if name == "tesserocr":
+        return TesserocrBackend()
+    return PytesseractBackend()
+
+
+# Set per process by configure_pipeline(); created lazily on first OCR call
+_ocr_backend = None
+
+# Set per process by configure_cache(); None disables the cache
+_ocr_cache = None
+
+# Per-process stage timings; pool workers send theirs back with each task
+_timer = StageTimer()
+
+# Box OCR threads, created once per process and kept for its lifetime so each
+# thread's tesserocr engine is loaded once rather than once per page
+_box_pool = None
+
+# Options of the current run, set by configure_pipeline() in the main process
+# and handed to every pool worker so they run with the same settings
+_pipeline_options = {}
+
+
+def configure_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, enabled=True):
+    global _ocr_cache
+    _ocr_cache = OCRCache(cache_dir, max_bytes) if enabled else None
+    return _ocr_cache
+
+
+def configure_pipeline(cache_dir=CACHE_DIR, cache_max_bytes=CACHE_MAX_BYTES, cache_enabled=True,
+                       text_layer=USE_TEXT_LAYER, segment=SEGMENT_BOXES, box_threads=1,
+                       profile_dir=None, preprocess=PREPROCESS, start_dpi=START_DPI, max_dpi=DPI,
+                       expected_voters=EXPECTED_VOTERS_PER_PAGE, ocr_backend=OCR_BACKEND):
+    global _pipeline_options, _ocr_backend, _box_pool
+    _pipeline_options = {
+        "cache_dir": cache_dir,
+        "cache_max_bytes": cache_max_bytes,
+        "cache_enabled": cache_enabled,
+        "text_layer": text_layer,
+        "segment": segment,
+        "box_threads": box_threads,
+        "profile_dir": profile_dir,
+        "preprocess": preprocess,
+        "start_dpi": start_dpi,
+        "max_dpi": max_dpi,
+        "expected_voters": expected_voters,
+        "ocr_backend": ocr_backend,
+    }
+    _ocr_backend = None
+    if _box_pool is not None:
+        _box_pool.shutdown()
+        _box_pool = None
+    return configure_cache(cache_dir, cache_max_bytes, cache_enabled)
+
+
+def get_box_pool():
+    global _box_pool
+    if _box_pool is None:
+        _box_pool = ThreadPoolExecutor(max_workers=max(1, _pipeline_options.get("box_threads", 1)))
+    return _box_pool
+
+
+def get_ocr_backend():
+    global _ocr_backend
+    if _ocr_backend is None:
+        _ocr_backend = make_ocr_backend(_pipeline_options.get("ocr_backend", OCR_BACKEND))
+    return _ocr_backend
+
+
+def ocr_image(image, config=OCR_CONFIG):
+    # Accepts a path to a page image or an already-rendered PIL image
+    img = Image.open(image) if isinstance(image, str) else image
+
+    backend = get_ocr_backend()
+    key = None
+    if _ocr_cache is not None:
+        with _timer.stage("cache"):
+            # Backends and Tesseract versions differ in output, so each
+            # engine only replays its own text
+            key = _ocr_cache.key(img, OCR_LANG, config, f"{backend.name} {backend.version}")
+            text = _ocr_cache.get(key)
+        if text is not None:
+            return text
+
+    with _timer.stage("ocr"):
+        text = backend.image_to_string(img, config)
+
+    if key is not None:
+        _ocr_cache.put(key, text)
     return text
 
+# ----------------------------
+# STEP 2a: IMAGE PREPROCESSING
+# ----------------------------
+
+def preprocess_page(img):
+    """Return a binarized, deskewed, border-cropped grayscale copy of a page."""
+    gray = cv2.cvtColor(np.array(img.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+    ink = cv2.bitwise_not(binary)
+
+    # Skew from the minimum-area rectangle around the ink, measured on a
+    # quarter-size copy to keep the point set small
+    small = cv2.resize(ink, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    points = cv2.findNonZero(small)
+    if points is not None:
+        angle = cv2.minAreaRect(points)[-1]
+        # OpenCV reports the angle in [-90, 0) or (0, 90] depending on version
+        if angle > 45:
+            angle -= 90
+        elif angle < -45:
+            angle += 90
+        if 0.1 <= abs(angle) <= MAX_SKEW_DEGREES:
+            height, width = binary.shape
+            matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+            binary = cv2.warpAffine(binary, matrix, (width, height), flags=cv2.INTER_NEAREST,
+                                    borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+            ink = cv2.bitwise_not(binary)
+
+    # Crop to rows/columns that carry more than stray specks of ink
+    rows = np.where((ink > 0).sum(axis=1) > ink.shape[1] * 0.005)[0]
+    cols = np.where((ink > 0).sum(axis=0) > ink.shape[0] * 0.005)[0]
+    if len(rows) and len(cols):
+        margin = 10
+        top, bottom = max(0, rows[0] - margin), min(binary.shape[0], rows[-1] + margin + 1)
+        left, right = max(0, cols[0] - margin), min(binary.shape[1], cols[-1] + margin + 1)
+        binary = binary[top:bottom, left:right]
+
+    return Image.fromarray(binary)
+
+# ----------------------------
+# STEP 2b: VOTER BOX SEGMENTATION
+# ----------------------------
+
+def find_voter_boxes(img):
+    """Return (row, col, (x, y, w, h)) for each voter box on a page, row-major."""
+    gray = cv2.cvtColor(np.array(img.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+
+    # Keep only long horizontal and vertical strokes, i.e. the box borders
+    height, width = binary.shape
+    h_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN,
+                               cv2.getStructuringElement(cv2.MORPH_RECT, (width // 30, 1)))
+    v_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN,
+                               cv2.getStructuringElement(cv2.MORPH_RECT, (1, height // 30)))
+    grid = cv2.dilate(cv2.add(h_lines, v_lines), np.ones((3, 3), np.uint8))
+
+    contours, _ = cv2.findContours(grid, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+    rects = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if (BOX_MIN_WIDTH * width <= w <= BOX_MAX_WIDTH * width
+                and BOX_MIN_HEIGHT * height <= h <= BOX_MAX_HEIGHT * height):
+            rects.append((x, y, w, h))
+    if not rects:
+        return []
+
+    # Nested contours of the same border show up twice; keep the outer one
+    rects.sort(key=lambda r: r[2] * r[3], reverse=True)
+    unique = []
+    for x, y, w, h in rects:
+        cx, cy = x + w // 2, y + h // 2
+        if not any(ux <= cx <= ux + uw and uy <= cy <= uy + uh for ux, uy, uw, uh in unique):
+            unique.append((x, y, w, h))
+
+    # Group into rows by vertical position, then order each row left to right
+    unique.sort(key=lambda r: r[1])
+    row_tolerance = sorted(r[3] for r in unique)[len(unique) // 2] // 2
+    boxes, row, row_y = [], -1, None
+    for rect in unique:
+        if row_y is None or rect[1] - row_y > row_tolerance:
+            row, row_y = row + 1, rect[1]
+        boxes.append((row, rect))
+    boxes.sort(key=lambda b: (b[0], b[1][0]))
+
+    positions = []
+    col, last_row = 0, None
+    for row, rect in boxes:
+        col = col + 1 if row == last_row else 0
+        last_row = row
+        positions.append((row, col, rect))
+    return positions
+
+
+def ocr_voter_boxes(img):
+    """OCR each detected voter box separately; None if the page has no box grid."""
+    with _timer.stage("segment"):
+        positions = find_voter_boxes(img)
+    if not positions:
+        return None
+
+    # Inset the crop so the box border itself is not read as text
+    crops = []
+    for _, _, (x, y, w, h) in positions:
+        pad = max(2, min(w, h) // 50)
+        crops.append(img.crop((x + pad, y + pad, x + w - pad, y + h - pad)))
+
+    # pytesseract runs tesseract in a subprocess and tesserocr releases the GIL,
+    # so the process's long-lived box threads OCR boxes in parallel
+    texts = list(get_box_pool().map(lambda crop: ocr_image(crop, BOX_OCR_CONFIG), crops))
+
+    voters = []
+    for (row, col, _), text in zip(positions, texts):
+        # One box holds one voter; anything else is bleed-through from a neighbour
+        found = parse_voters(text)
+        if found:
+            voter = found[0]
+            voter["box_row"], voter["box_col"] = row, col
+            voters.append(voter)
+    return voters
+
 # ----------------------------
 # STEP 3: EXTRACT VOTERS
 # ----------------------------
@@ -71,76 +464,382 @@ import regex as re
 
 def extract_voters(text):
     voters = []
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-
     current = None
 
-    for line in lines:
-
+    # One tuple per token; only the group of the alternative that matched is set
+    for voter_id, relation, name, house_no, age, gender in LINE_TOKENS.findall(text):
         # --- Detect voter ID ---
-        vid = re.search(r"(IKU|LPN)\d+", line)
-        if vid:
-            if current:
-                voters.append(current)
-
-            current = {
-                "voter_id": vid.group(),
-                "age": None,
-                "gender": None
-            }
+        if voter_id:
+            current = dict.fromkeys(VOTER_FIELDS)
+            current["voter_id"] = voter_id
+            voters.append(current)
             continue
 
-        if not current:
+        # Labels before the first voter ID are page headers; within a record
+        # the first non-empty value of a field wins
+        if current is None:
             continue
+        if relation:
+            relation = relation.rstrip()
+            if relation and current["relation"] is None:
+                current["relation"] = relation
+        elif name:
+            name = name.rstrip()
+            if name and current["name"] is None:
+                current["name"] = name
+        elif house_no:
+            if current["house_no"] is None:
+                current["house_no"] = house_no
+        elif age:
+            if current["age"] is None:
+                current["age"] = age
+        elif gender:
+            if current["gender"] is None:
+                current["gender"] = GENDERS[gender]
 
-        # --- Extract age (number near 'வயது') ---
-        if "வயது" in line:
-            age = re.search(r"\d{2}", line)
-            if age:
-                current["age"] = age.group()
+    return voters
 
-        # --- Extract gender ---
-        if "பாலினம்" in line:
-            if "பெண்" in line:
-                current["gender"] = "பெண்"
-            elif "ஆண்" in line:
-                current["gender"] = "ஆண்"
 
-    if current:
-        voters.append(current)
+def parse_voters(text):
+    with _timer.stage("parse"):
+        return extract_voters(text)
 
-    return voters
 
+EPIC_PATTERN = re.compile(r"[A-Z]{3}\d{7}")
+CORE_FIELDS = ("name", "relation", "age", "gender")
 
-# ----------------------------
-# MAIN PIPELINE
-# ----------------------------
 
-def main():
-    print("[*] Starting voter extraction...")
+def text_layer_usable(voters):
+    # A broken font map still yields the odd voter ID; only trust the text
+    # layer when nearly every record parsed completely
+    if not voters:
+        return False
+    complete = sum(
+        1 for v in voters
+        if EPIC_PATTERN.fullmatch(v["voter_id"]) and all(v[f] for f in CORE_FIELDS)
+    )
+    return complete / len(voters) >= TEXT_LAYER_MIN_COMPLETE
 
-    # images = pdf_to_images(PDF_PATH, IMG_DIR)
-    images = sorted([
-    os.path.join(IMG_DIR, f)
-    for f in os.listdir(IMG_DIR)
-    if f.endswith(".png")
-])
 
-    all_voters = []
+# ----------------------------
+# STEP 4: PAGE WORKERS
+# ----------------------------
 
-    for img in images:
-        print(f"[*] OCR processing: {img}")
-        text = ocr_image(img)
-        voters = extract_voters(text)
-        all_voters.extend(voters)
+def _init_worker(options):
+    # Tesseract spawns its own OpenMP threads; with one process per core
+    # that oversubscribes the CPU, so pin each worker's tesseract to 1 thread.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    configure_pipeline(**options)
+    if options.get("segment"):
+        get_box_pool()
+
+    if options.get("profile_dir"):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        # Pool workers leave through multiprocessing's exit path, not atexit
+        path = os.path.join(options["profile_dir"], f"worker-{os.getpid()}.prof")
+        mp_util.Finalize(None, _dump_profile, args=(profiler, path), exitpriority=10)
+
+
+def _dump_profile(profiler, path):
+    profiler.disable()
+    profiler.dump_stats(path)
+
+
+def _run_task(process, task):
+    # Ship this task's stage timings back with its pages
+    _timer.reset()
+    pages = process(task)
+    return pages, _timer.snapshot()
+
+
+def page_voters(img):
+    if _pipeline_options.get("preprocess", PREPROCESS):
+        with _timer.stage("preprocess"):
+            img = preprocess_page(img)
+
+    if _pipeline_options.get("segment", SEGMENT_BOXES):
+        voters = ocr_voter_boxes(img)
+        if voters is not None:
+            return voters
+    # No box grid found (cover/summary pages) or segmentation off: OCR the whole page
+    return parse_voters(ocr_image(img))
+
+
+def ocr_page(image_path):
+    with _timer.stage("png_io"):
+        img = Image.open(image_path)
+        img.load()
+    with img:
+        return [(image_path, page_voters(img))]
+
+
+def ocr_pdf_window(window):
+    pdf_path, first_page, last_page = window
+    voters_by_page = {}
+
+    # Fast path: digitally generated rolls carry a text layer, which parses
+    # in milliseconds instead of a 300 DPI render plus Tesseract
+    if _pipeline_options.get("text_layer", USE_TEXT_LAYER):
+        for page_no in range(first_page, last_page + 1):
+            voters = parse_voters(extract_text_layer(pdf_path, page_no))
+            if text_layer_usable(voters):
+                voters_by_page[page_no] = voters
+
+    # Render and OCR only the pages the text layer could not answer, at the
+    # cheap starting DPI first
+    start_dpi = _pipeline_options.get("start_dpi", START_DPI)
+    max_dpi = _pipeline_options.get("max_dpi", DPI)
+    expected = _pipeline_options.get("expected_voters", EXPECTED_VOTERS_PER_PAGE)
+    needs_ocr = [n for n in range(first_page, last_page + 1) if n not in voters_by_page]
+    for _, first, last in iter_pdf_windows(pdf_path, last_page - first_page + 1, needs_ocr):
+        for page_no, img in enumerate(render_pages(pdf_path, first, last, dpi=start_dpi), start=first):
+            voters_by_page[page_no] = page_voters(img)
+            img.close()
+
+    # A short page may just be unreadable at low resolution: retry it at max_dpi
+    # and keep whichever pass found more voters
+    if start_dpi < max_dpi:
+        for page_no in needs_ocr:
+            if len(voters_by_page[page_no]) >= expected:
+                continue
+            img = render_pages(pdf_path, page_no, page_no, dpi=max_dpi)[0]
+            voters = page_voters(img)
+            img.close()
+            if len(voters) > len(voters_by_page[page_no]):
+                voters_by_page[page_no] = voters
+
+    return [(pdf_page_id(pdf_path, n), voters_by_page[n]) for n in range(first_page, last_page + 1)]
+
+
+def iter_page_results(tasks, process=ocr_page, workers=WORKERS):
+    """Run process() over tasks and yield (page, voters) for each page, in page order.
+
+    process() takes one task and returns a list of (page, voters) pairs.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield from process(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(_pipeline_options,)) as pool:
+        # map() hands out tasks as workers free up but yields in input order,
+        # so a page's rows are released as soon as every earlier page is done.
+        for pages, stages in pool.map(partial(_run_task, process), tasks):
+            _timer.merge(stages)
+            yield from pages
+
+
+def page_sort_key(path):
+    # page_2.png must sort before page_10.png
+    return [int(tok) if tok.isdigit() else tok for tok in re.split(r"(\d+)", path)]
+
+
+def list_page_images(img_dir):
+    return sorted([
+        os.path.join(img_dir, f)
+        for f in os.listdir(img_dir)
+        if f.endswith(".png")
+    ], key=page_sort_key)
 
-    df = pd.DataFrame(all_voters)
+# ----------------------------
+# MAIN PIPELINE
+# ----------------------------
 
-    df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
+def plan_pdf_job(pdf_path, output_csv, window, restart=False):
+    """Return (job, tasks) for the pages of pdf_path not yet committed to output_csv."""
+    page_numbers = list(range(1, pdf_page_count(pdf_path) + 1))
+    job = RollJob(output_csv, [pdf_page_id(pdf_path, n) for n in page_numbers],
+                  VOTER_FIELDS, restart=restart, source=pdf_path)
+    pending = [n for n in page_numbers if pdf_page_id(pdf_path, n) not in job.done]
+    return job, list(iter_pdf_windows(pdf_path, window, pending))
+
+
+def write_voters_csv(page_results, jobs, dataset=None):
+    """Commit each page's voters to the CSV of the job that owns it.
+
+    Returns (total voters across the jobs, pages processed in this run).
+
+    Pages arrive in task order, so each job is opened on its first page and
+    closed (marked complete) as soon as its last page is committed. With a
+    dataset writer, the same rows are also appended to its Parquet partition.
+    """
+    owner = {page: job for job in jobs for page in job.pending()}
+    open_jobs = []
+    pages_done = 0
+
+    def open_job(job):
+        job.open()
+        if dataset is not None and job.resumed:
+            # The Parquet file is rewritten each run; replay pages the CSV already holds
+            dataset.write(job.source, job.committed_rows())
+        return job
+
+    def close_job(job):
+        # The Parquet file must be on disk before the manifest says complete,
+        # or a crash in between leaves a finished job with no dataset file
+        if dataset is not None:
+            dataset.close_source(job.source)
+        job.close()
+
+    try:
+        for job in jobs:
+            # Every page was committed before a crash but the job was never closed
+            if not job.pending() and not job.complete:
+                close_job(open_job(job))
+
+        for page, voters in page_results:
+            job = owner[page]
+            if job not in open_jobs:
+                open_jobs.append(open_job(job))
+            with _timer.stage("write"):
+                job.commit(page, voters)
+                if dataset is not None:
+                    dataset.write(job.source, voters)
+            pages_done += 1
+            print(f"[*] OCR processed: {page} ({len(voters)} voters)")
+            if not job.pending():
+                close_job(job)
+                open_jobs.remove(job)
+                print(f"[✓] Saved {job.voters} voters to {job.output_csv}")
+    finally:
+        for job in open_jobs:
+            close_job(job)
+    return sum(job.voters for job in jobs), pages_done
+
+
+def find_batch_pdfs(batch):
+    # A directory means every PDF in it; anything else is treated as a glob
+    pattern = os.path.join(batch, BATCH_PATTERN) if os.path.isdir(batch) else batch
+    return sorted(glob.glob(pattern), key=page_sort_key)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract voter rows from electoral roll page images")
+    parser.add_argument("--images", default=IMG_DIR, help="directory of page PNGs")
+    parser.add_argument("--pdf", help="stream pages straight from this PDF instead of --images")
+    parser.add_argument("--batch", help="directory or glob of roll PDFs to extract in one run")
+    parser.add_argument("--out-dir", default=BATCH_OUTPUT_DIR,
+                        help="where --batch writes per-PDF CSVs and the combined dataset")
+    parser.add_argument("--window", type=int, default=RENDER_WINDOW,
+                        help="pages rendered at a time per worker in --pdf/--batch mode")
+    parser.add_argument("--segment", action="store_true",
+                        help="detect voter boxes with OpenCV and OCR each box separately")
+    parser.add_argument("--box-threads", type=int,
+                        help="concurrent box OCR calls per worker (default: cores / workers)")
+    parser.add_argument("--dpi", type=int, default=START_DPI,
+                        help="first-pass render DPI in --pdf/--batch mode")
+    parser.add_argument("--max-dpi", type=int, default=DPI,
+                        help="DPI for re-rendering pages that came up short of --expected-voters")
+    parser.add_argument("--expected-voters", type=int, default=EXPECTED_VOTERS_PER_PAGE,
+                        help="voter boxes on a full roll page")
+    parser.add_argument("--no-preprocess", action="store_true",
+                        help="OCR raw renders without binarization, deskew and border cropping")
+    parser.add_argument("--ocr-backend", choices=["auto", "tesserocr", "pytesseract"], default=OCR_BACKEND,
+                        help="in-process tesserocr engine or the tesseract binary per page")
+    parser.add_argument("--no-text-layer", action="store_true",
+                        help="always OCR, even when a PDF page has a usable text layer")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always run Tesseract, bypassing the OCR result cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="OCR result cache directory")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--output", default=OUTPUT_CSV, help="output CSV path")
+    parser.add_argument("--parquet", help="also write a partitioned Parquet dataset to this directory "
+                                          "(--batch always writes one to <out-dir>/" + COMBINED_DATASET + ")")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="OCR worker processes (1 = serial)")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the job manifest and start from the first page")
+    parser.add_argument("--report", default=REPORT_JSON, help="per-stage timing report (JSON)")
+    parser.add_argument("--profile-dir",
+                        help="write a cProfile dump per worker process to this directory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"[*] Starting voter extraction with {args.workers} worker(s)...")
+    box_threads = args.box_threads or max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    cache = configure_pipeline(args.cache_dir, args.cache_max_mb * 1024 * 1024, not args.no_cache,
+                               text_layer=not args.no_text_layer, segment=args.segment,
+                               box_threads=box_threads, profile_dir=args.profile_dir,
+                               preprocess=not args.no_preprocess, start_dpi=args.dpi,
+                               max_dpi=max(args.dpi, args.max_dpi), expected_voters=args.expected_voters,
+                               ocr_backend=args.ocr_backend)
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    profiler = cProfile.Profile() if args.profile_dir and args.workers <= 1 else None
+    start_wall, start_cpu = time.perf_counter(), cpu_seconds()
+
+    dataset_dir = args.parquet
+    if args.batch:
+        pdfs = find_batch_pdfs(args.batch)
+        print(f"[*] Found {len(pdfs)} PDFs for batch extraction")
+        os.makedirs(args.out_dir, exist_ok=True)
+        dataset_dir = dataset_dir or os.path.join(args.out_dir, COMBINED_DATASET)
+        jobs, tasks = [], []
+        for pdf_path in pdfs:
+            csv_path = os.path.join(args.out_dir, source_stem(pdf_path) + ".csv")
+            job, pdf_tasks = plan_pdf_job(pdf_path, csv_path, args.window, args.restart)
+            jobs.append(job)
+            tasks.extend(pdf_tasks)
+        # One pool over the pages of every PDF, so workers never idle at file boundaries
+        page_results = iter_page_results(tasks, ocr_pdf_window, args.workers)
+    elif args.pdf:
+        # Streaming mode: render a window of pages at a time and OCR it in
+        # memory, so no intermediate PNGs and memory bounded by the window
+        job, tasks = plan_pdf_job(args.pdf, args.output, args.window, args.restart)
+        jobs = [job]
+        page_results = iter_page_results(tasks, ocr_pdf_window, args.workers)
+    else:
+        # images = pdf_to_images(PDF_PATH, IMG_DIR)
+        job = RollJob(args.output, list_page_images(args.images), VOTER_FIELDS,
+                      restart=args.restart, source=args.images)
+        jobs = [job]
+        page_results = iter_page_results(job.pending(), ocr_page, args.workers)
+
+    for job in jobs:
+        if job.complete:
+            print(f"[✓] {job.output_csv} is already complete (use --restart to redo it)")
+        elif job.resumed:
+            print(f"[*] Resuming {job.output_csv}: {len(job.done)} of {len(job.pages)} pages already done")
+
+    resumed_voters = sum(job.voters for job in jobs)
+    dataset = VoterDatasetWriter(dataset_dir) if dataset_dir else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        total, pages_done = write_voters_csv(page_results, jobs, dataset)
+    finally:
+        if dataset is not None:
+            dataset.close()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(args.profile_dir, "main.prof"))
+
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            print(f"[*] Evicted {evicted} OCR cache entries")
 
     print(f"[✓] Extraction complete")
-    print(f"[✓] Total voters extracted: {len(df)}")
-    print(f"[✓] Saved to {OUTPUT_CSV}")
+    print(f"[✓] Total voters extracted: {total}")
+    if args.batch:
+        print(f"[✓] Saved {len(jobs)} CSVs to {args.out_dir}")
+    else:
+        print(f"[✓] Saved to {args.output}")
+    if dataset is not None:
+        print(f"[✓] Wrote {dataset.rows} rows to Parquet dataset {dataset_dir}")
+
+    # Pool workers (and their tesseract children) count towards children_*
+    # CPU once the pool has been joined, which it is by now
+    report = build_report(_timer, time.perf_counter() - start_wall, cpu_seconds() - start_cpu,
+                          pages_done, total - resumed_voters, args.workers)
+    write_report(report, args.report)
+    print(format_summary(report))
+    print(f"[✓] Timing report saved to {args.report}")
 
 # ----------------------------
 # ENTRY POINT
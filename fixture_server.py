@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# ----------------------------
+# LOCAL STAND-IN FOR affidavit.eci.gov.in
+# ----------------------------
+# Serves HTML saved with `eci_scraper.py --save-html DIR` so the scrapers
+# can be exercised offline:
+#   listing URLs with ?page=N  ->  DIR/page_N.html (404 past the last page)
+#   anything else              ->  the file at that path under DIR
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        parts = urlsplit(path)
+        page = parse_qs(parts.query).get("page")
+        if page:
+            return os.path.join(self.directory, f"page_{page[0]}.html")
+        return super().translate_path(parts.path)
+
+    def guess_type(self, path):
+        if path.endswith(".html") or "." not in os.path.basename(path):
+            return "text/html; charset=utf-8"
+        return super().guess_type(path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(directory, port=0):
+    """Serve directory on localhost in a background thread; return (server, base_url)."""
+    def handler(*args, **kwargs):
+        return FixtureHandler(*args, directory=directory, **kwargs)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python fixture_server.py <saved html dir> [port]")
+        print("Example: python fixture_server.py saved_pages 8000")
+    else:
+        server, base_url = start_fixture_server(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+        print(f"Serving {sys.argv[1]} at {base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
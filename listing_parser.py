@@ -0,0 +1,70 @@
+from selectolax.lexbor import LexborHTMLParser
+
+# ----------------------------
+# STRUCTURAL LISTING PARSER
+# ----------------------------
+# Parses an affidavit listing page once with lexbor (via selectolax) and reads
+# each field from its own label element instead of regex-scanning row text.
+# Expected row layout:
+#   <table id="data-tab"><tbody><tr> ...
+#     <h4 class="bg-blu">NAME</h4>
+#     <p><strong>Party :</strong> ...</p>   (likewise Status, State, Constituency)
+#     <a href="/show-profile/...">View more</a>
+
+ROW_SELECTOR = "#data-tab tbody tr"
+NAME_SELECTOR = "h4.bg-blu"
+PROFILE_SELECTOR = 'a[href*="show-profile"]'
+
+LABELS = {
+    "party": "party",
+    "status": "status",
+    "state": "state",
+    "constituency": "constituency",
+}
+
+
+def parse_listing_rows(html, base_url, extra=None):
+    """Return the unique candidates on a listing page.
+
+    Returns None when the page does not have the expected row layout, so the
+    caller can fall back to the lenient BeautifulSoup parser.
+    """
+    rows = LexborHTMLParser(html).css(ROW_SELECTOR)
+    if not rows:
+        return None
+
+    results = []
+    seen_names = set()
+    matched = False
+    for row in rows:
+        name_el = row.css_first(NAME_SELECTOR)
+        if name_el is None:
+            continue
+        matched = True
+
+        name = name_el.text(strip=True)
+        if not name or "Election" in name or name in seen_names:
+            continue
+        seen_names.add(name)
+
+        candidate = {"name": name, "party": "N/A", "state": "N/A", "status": "N/A", "constituency": "N/A"}
+        for p in row.css("p"):
+            label, sep, value = p.text(separator=" ", strip=True).partition(":")
+            field = LABELS.get(label.strip().lower())
+            if sep and field:
+                candidate[field] = value.strip() or "N/A"
+
+        link = row.css_first(PROFILE_SELECTOR)
+        href = link.attributes.get("href") if link is not None else None
+        if not href:
+            candidate["view_more_link"] = "N/A"
+        elif href.startswith("/"):
+            candidate["view_more_link"] = base_url + href
+        else:
+            candidate["view_more_link"] = href
+
+        if extra:
+            candidate.update(extra)
+        results.append(candidate)
+
+    return results if matched else None
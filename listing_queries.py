@@ -0,0 +1,30 @@
+from sqlalchemy.orm import joinedload, contains_eager
+from database import Candidate, AllianceParty
+
+# --- Eager-loading query builders for listing views ---
+# Every relationship a listing row touches is loaded with the rows, so a page
+# costs the same number of queries whether it shows 5 rows or 500.
+
+def candidate_listing(db):
+    """Candidates with party, alliance and constituency loaded in the same query.
+
+    Joins constituencies (filter on Constituency.* freely) and fills
+    constituency_rel from that join.
+    """
+    return (
+        db.query(Candidate)
+        .join(Candidate.constituency_rel)
+        .options(
+            contains_eager(Candidate.constituency_rel),
+            joinedload(Candidate.party),
+            joinedload(Candidate.alliance),
+        )
+    )
+
+def alliance_members(db, alliance_id):
+    """An alliance's member rows with each member's party loaded alongside."""
+    return (
+        db.query(AllianceParty)
+        .options(joinedload(AllianceParty.party))
+        .filter(AllianceParty.alliance_id == alliance_id)
+    )
@@ -0,0 +1,147 @@
+import os
+import io
+import csv
+import sys
+import glob
+from database import engine, init_db, Constituency, SessionLocal
+from voter_dataset import part_number
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Rows sent per COPY round trip
+COPY_CHUNK_ROWS = 100_000
+
+COPY_COLUMNS = ["constituency_id", "part_no", "voter_id", "name", "relation", "house_no", "age", "gender", "source"]
+
+# extract.py writes the Tamil gender labels from the roll
+GENDERS = {"ஆண்": "Male", "பெண்": "Female", "மூன்றாம் பாலினம்": "Other"}
+
+# ----------------------------
+# INPUT
+# ----------------------------
+
+def find_csvs(paths):
+    # Directories (e.g. an extract.py --batch --out-dir) contribute every CSV in them
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        else:
+            found.append(path)
+    return found
+
+
+def _to_age(value):
+    return value if value and value.isdigit() and int(value) < 128 else ""
+
+
+def iter_copy_rows(constituency_id, csv_path):
+    part = part_number(csv_path)
+    part = part if part.isdigit() else ""
+    source = os.path.basename(csv_path)
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            yield [
+                constituency_id, part, row.get("voter_id") or "", row.get("name") or "",
+                row.get("relation") or "", row.get("house_no") or "", _to_age(row.get("age")),
+                GENDERS.get(row.get("gender"), ""), source,
+            ]
+
+# ----------------------------
+# BULK LOAD
+# ----------------------------
+
+def copy_rows(cursor, rows):
+    # Empty CSV fields load as NULL
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(rows)
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY voters ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+
+
+def refresh_constituency_counts(cursor, constituency_ids):
+    # One set-based UPDATE driven by the ids themselves, so a constituency
+    # reloaded with no rows is reset to zero instead of keeping old totals
+    cursor.execute("""
+        UPDATE constituencies AS c
+        SET total_voters = COALESCE(s.total, 0),
+            male_voters = COALESCE(s.male, 0),
+            female_voters = COALESCE(s.female, 0),
+            third_gender_voters = COALESCE(s.other, 0)
+        FROM unnest(%s::int[]) AS ids(id)
+        LEFT JOIN (
+            SELECT constituency_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE gender = 'Male') AS male,
+                   count(*) FILTER (WHERE gender = 'Female') AS female,
+                   count(*) FILTER (WHERE gender = 'Other') AS other
+            FROM voters
+            WHERE constituency_id = ANY(%s::int[])
+            GROUP BY constituency_id
+        ) AS s ON s.constituency_id = ids.id
+        WHERE c.id = ids.id
+    """, (list(constituency_ids), list(constituency_ids)))
+
+
+def load_constituency(constituency_id, csv_paths):
+    """Replace a constituency's voters with the rows of csv_paths; return the row count."""
+    total = 0
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        partition = f"voters_c{int(constituency_id)}"
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF voters FOR VALUES IN ({int(constituency_id)})"
+        )
+        # Reloads replace the constituency wholesale; truncating its partition is instant
+        cursor.execute(f"TRUNCATE {partition}")
+
+        for csv_path in csv_paths:
+            chunk = []
+            for row in iter_copy_rows(constituency_id, csv_path):
+                chunk.append(row)
+                if len(chunk) >= COPY_CHUNK_ROWS:
+                    copy_rows(cursor, chunk)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                copy_rows(cursor, chunk)
+                total += len(chunk)
+            print(f"[*] Loaded {csv_path}")
+
+        refresh_constituency_counts(cursor, [constituency_id])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return total
+
+
+def find_constituency(db, key):
+    if key.isdigit():
+        return db.query(Constituency).filter(Constituency.id == int(key)).first()
+    return db.query(Constituency).filter(Constituency.name.ilike(key)).first()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python load_voters.py <constituency id or name> <csv or directory> [...]")
+        print("Example: python load_voters.py Thirukkoyilur output/")
+    else:
+        init_db()
+        db = SessionLocal()
+        constituency = find_constituency(db, sys.argv[1])
+        db.close()
+        if not constituency:
+            print(f"Error: Constituency '{sys.argv[1]}' not found.")
+        else:
+            csv_paths = find_csvs(sys.argv[2:])
+            rows = load_constituency(constituency.id, csv_paths)
+            print(f"Successfully loaded {rows} voters from {len(csv_paths)} file(s) into {constituency.name}")
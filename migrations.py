@@ -0,0 +1,87 @@
+import sys
+from datetime import datetime
+from sqlalchemy import inspect, text
+
+# --- Schema migrations ---
+# create_all() only creates missing tables; changes to existing tables are
+# applied here, in order, each recorded in schema_migrations once it has run.
+# Models in database.py describe the final schema, so on a fresh database
+# these steps find their work already done and only get recorded.
+
+# Recomputes every option's vote_count from poll_votes in one GROUP BY
+RESYNC_VOTE_COUNTS_SQL = """
+UPDATE opinion_poll_options AS o
+SET vote_count = coalesce(v.votes, 0)
+FROM opinion_poll_options AS oo
+LEFT JOIN (SELECT option_id, count(*) AS votes FROM poll_votes GROUP BY option_id) AS v
+    ON v.option_id = oo.id
+WHERE oo.id = o.id
+"""
+
+# Arbitrary key for pg_advisory_xact_lock: one app process migrates at a time
+MIGRATION_LOCK_ID = 7_310_251
+
+def _vote_counts(conn):
+    # opinion_poll_options.vote_count: per-option counter kept by polls.cast_vote
+    columns = {c["name"] for c in inspect(conn).get_columns("opinion_poll_options")}
+    if "vote_count" not in columns:
+        conn.execute(text("ALTER TABLE opinion_poll_options ADD COLUMN vote_count INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text(RESYNC_VOTE_COUNTS_SQL))
+
+def _poll_vote_indexes(conn):
+    # The unique index needs one vote per (poll, ip): keep the earliest of any duplicates
+    conn.execute(text("""
+        DELETE FROM poll_votes
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (PARTITION BY poll_id, ip_address ORDER BY id) AS n
+                FROM poll_votes
+            ) AS ranked
+            WHERE n > 1
+        )
+    """))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_poll_votes_poll_ip ON poll_votes (poll_id, ip_address)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_poll_votes_option_id ON poll_votes (option_id)"))
+    conn.execute(text(RESYNC_VOTE_COUNTS_SQL))
+
+MIGRATIONS = [
+    ("001_vote_counts", "Add and backfill opinion_poll_options.vote_count", _vote_counts),
+    ("002_poll_vote_indexes", "Unique (poll_id, ip_address) and option_id indexes on poll_votes", _poll_vote_indexes),
+]
+
+_migrated_engines = set()
+
+def applied_migrations(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations (version VARCHAR PRIMARY KEY, applied_at VARCHAR)"))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def run_migrations(engine):
+    """Apply pending migrations, each in its own transaction; return the versions applied."""
+    if id(engine) in _migrated_engines:
+        return []
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            if version in applied_migrations(conn):
+                continue
+            migrate(conn)
+            conn.execute(text("INSERT INTO schema_migrations (version, applied_at) VALUES (:v, :at)"),
+                         {"v": version, "at": datetime.now().isoformat()})
+        print(f"[✓] Migration {version}: {description}")
+        applied.append(version)
+    _migrated_engines.add(id(engine))
+    return applied
+
+if __name__ == "__main__":
+    from database import engine, init_db
+    if "--status" in sys.argv:
+        with engine.begin() as conn:
+            done = applied_migrations(conn)
+        for version, description, _ in MIGRATIONS:
+            print(f"[{'✓' if version in done else ' '}] {version}: {description}")
+    else:
+        init_db()
+        print("[✓] Database schema is up to date")
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# fsync after this many records or seconds, whichever comes first
+FSYNC_EVERY = 200
+FSYNC_INTERVAL = 5.0
+
+DONE_SUFFIX = ".done"
+TAIL_POLL_INTERVAL = 0.5
+
+# ----------------------------
+# APPEND-ONLY SINK
+# ----------------------------
+
+def done_marker(path):
+    return path + DONE_SUFFIX
+
+
+class NDJSONSink:
+    """Appends one JSON record per line as results arrive.
+
+    Every batch is flushed so tail() readers see it immediately; it is fsynced
+    every FSYNC_EVERY records or FSYNC_INTERVAL seconds, so a crash loses at
+    most that much. Closing cleanly drops a `<path>.done` marker that tells
+    followers the stream is finished.
+    """
+
+    def __init__(self, path, append=False, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        if os.path.exists(done_marker(path)):
+            os.remove(done_marker(path))
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.count += 1
+            self._unsynced += 1
+        self._file.flush()
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self, complete=True):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+        if complete:
+            open(done_marker(self.path), "w").close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(complete=exc_type is None)
+
+# ----------------------------
+# READERS
+# ----------------------------
+
+def read_records(path):
+    """All complete records in the stream; a torn last line from a crash is skipped."""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n") and line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def tail(path, follow=True, poll_interval=TAIL_POLL_INTERVAL):
+    """Yield records as they are appended to the stream.
+
+    With follow, keeps polling until the writer closes the sink (the .done
+    marker appears) and every record has been read; otherwise stops at EOF.
+    """
+    while not os.path.exists(path):
+        if not follow:
+            return
+        time.sleep(poll_interval)
+
+    with open(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                if line.strip():
+                    yield json.loads(line)
+                continue
+            # At EOF, possibly mid-line: rewind the partial record and wait for the rest
+            f.seek(-len(line), os.SEEK_CUR)
+            if not follow:
+                return
+            if os.path.exists(done_marker(path)):
+                # The writer finished; one last read picks up anything written before the marker
+                rest = f.read()
+                for line in rest.splitlines(keepends=True):
+                    if line.endswith(b"\n") and line.strip():
+                        yield json.loads(line)
+                return
+            time.sleep(poll_interval)
+
+# ----------------------------
+# COMPACTION
+# ----------------------------
+
+def _atomic_replace(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def compact(path, json_path=None, parquet_path=None, key=None):
+    """Rewrite the stream as a JSON array and/or a Parquet file, each replaced atomically.
+
+    With key, a record seen more than once (e.g. from a re-run appended to the
+    same stream) keeps its first position and its latest value.
+    """
+    records = read_records(path)
+    if key is not None:
+        latest = {}
+        for record in records:
+            latest[key(record)] = record
+        records = list(latest.values())
+
+    if json_path:
+        def write_json(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+        _atomic_replace(json_path, write_json)
+
+    if parquet_path:
+        _atomic_replace(parquet_path, lambda tmp: pq.write_table(pa.Table.from_pylist(records), tmp))
+
+    return records
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("compact", "tail"):
+        print("Usage: python ndjson_sink.py compact <stream.ndjson> <output.json> [output.parquet]")
+        print("       python ndjson_sink.py tail <stream.ndjson>")
+    elif sys.argv[1] == "tail":
+        for record in tail(sys.argv[2]):
+            print(json.dumps(record, ensure_ascii=False))
+    else:
+        records = compact(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+        print(f"[✓] Compacted {len(records)} records into {', '.join(sys.argv[3:])}")
@@ -0,0 +1,89 @@
+import os
+import hashlib
+import tempfile
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+CACHE_DIR = ".ocr_cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the stored format changes so old entries are never replayed
+CACHE_VERSION = "1"
+
+# ----------------------------
+# OCR RESULT CACHE
+# ----------------------------
+
+class OCRCache:
+    """Content-addressed store of raw Tesseract text.
+
+    Entries are keyed by a hash of the page pixels plus the OCR engine,
+    language and config, so the same page hits the cache whether it came
+    from a PNG in images/ or was rendered straight from the PDF, but never
+    replays text another backend or Tesseract version produced.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, img, lang, config, engine=""):
+        # engine names the OCR backend and its version, e.g. "tesserocr 5.3.0"
+        h = hashlib.sha256()
+        h.update(f"{CACHE_VERSION}|{engine}|{lang}|{config}|{img.mode}|{img.size}|".encode())
+        h.update(img.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def get(self, key):
+        path = self._path(key)
+        # Another worker's evict() can delete the entry between the read and
+        # the mtime refresh; either way it is a miss
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            # Refresh mtime so eviction drops least recently used entries first
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return text
+
+    def put(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent workers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Stages in pipeline order, for the summary table
+STAGES = ["png_io", "render", "text_layer", "preprocess", "cache", "segment", "ocr", "parse", "write"]
+
+# ----------------------------
+# STAGE TIMERS
+# ----------------------------
+
+def cpu_seconds():
+    # Includes finished child processes, i.e. the tesseract runs pytesseract waits on
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class StageTimer:
+    """Accumulates wall and CPU seconds per pipeline stage.
+
+    Stages timed from several threads at once add up their own wall time,
+    so a stage can exceed the run's elapsed time; CPU is process-wide and is
+    only exact for single-threaded stages.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, cpu_seconds() - cpu)
+
+    def add(self, name, wall, cpu, calls=1):
+        with self._lock:
+            stats = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            stats["wall"] += wall
+            stats["cpu"] += cpu
+            stats["calls"] += calls
+
+    def merge(self, stages):
+        for name, stats in stages.items():
+            self.add(name, stats["wall"], stats["cpu"], stats["calls"])
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self.stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+# ----------------------------
+# RUN REPORT
+# ----------------------------
+
+def build_report(timer, wall, cpu, pages, voters, workers):
+    stages = timer.snapshot()
+    ordered = [s for s in STAGES if s in stages] + sorted(set(stages) - set(STAGES))
+    return {
+        "workers": workers,
+        "pages": pages,
+        "voters": voters,
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "pages_per_sec": round(pages / wall, 3) if wall else None,
+        "voters_per_sec": round(voters / wall, 3) if wall else None,
+        "stages": {
+            name: {
+                "wall_seconds": round(stages[name]["wall"], 3),
+                "cpu_seconds": round(stages[name]["cpu"], 3),
+                "calls": stages[name]["calls"],
+            }
+            for name in ordered
+        },
+    }
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+
+def format_summary(report):
+    lines = [
+        f"{report['pages']} pages, {report['voters']} voters in {report['wall_seconds']:.1f}s "
+        f"with {report['workers']} worker(s): "
+        f"{report['pages_per_sec'] or 0:.2f} pages/sec, {report['voters_per_sec'] or 0:.1f} voters/sec",
+        f"{'stage':<12}{'wall s':>10}{'cpu s':>10}{'calls':>8}{'share':>8}",
+    ]
+    total = sum(s["wall_seconds"] for s in report["stages"].values()) or 1
+    for name, s in report["stages"].items():
+        lines.append(f"{name:<12}{s['wall_seconds']:>10.2f}{s['cpu_seconds']:>10.2f}"
+                     f"{s['calls']:>8}{s['wall_seconds'] / total:>8.0%}")
+    return "\n".join(lines)
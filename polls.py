@@ -0,0 +1,57 @@
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from database import OpinionPollOption, PollVote
+from migrations import RESYNC_VOTE_COUNTS_SQL
+
+# --- Poll results ---
+# Live results read the denormalized opinion_poll_options.vote_count, so
+# they cost one query however many options or votes a poll has.
+OptionResult = namedtuple("OptionResult", "id name color symbol_image_url votes")
+
+def poll_results(db, poll_id):
+    rows = (
+        db.query(OpinionPollOption.id, OpinionPollOption.name, OpinionPollOption.color,
+                 OpinionPollOption.symbol_image_url, OpinionPollOption.vote_count)
+        .filter(OpinionPollOption.poll_id == poll_id)
+        .order_by(OpinionPollOption.id)
+        .all()
+    )
+    return [OptionResult(*row) for row in rows]
+
+def poll_vote_totals(db):
+    """{poll_id: total votes} for every poll, in a single GROUP BY."""
+    rows = (
+        db.query(OpinionPollOption.poll_id, func.sum(OpinionPollOption.vote_count))
+        .group_by(OpinionPollOption.poll_id)
+        .all()
+    )
+    return {poll_id: int(total or 0) for poll_id, total in rows}
+
+def resync_vote_counts(db):
+    # Repairs the counters if poll_votes was ever changed outside cast_vote
+    db.execute(text(RESYNC_VOTE_COUNTS_SQL))
+    db.commit()
+
+# --- Voting ---
+def cast_vote(db, poll_id, option_id, ip_address):
+    """Record a vote and bump its option's counter in one transaction.
+
+    The insert is INSERT ... ON CONFLICT DO NOTHING against the unique
+    (poll_id, ip_address) index, so the duplicate check and the insert are one
+    atomic statement and two quick clicks cannot both count. Returns False if
+    this IP had already voted in the poll.
+    """
+    stmt = (
+        insert(PollVote)
+        .values(poll_id=poll_id, option_id=option_id, ip_address=ip_address, voted_at=str(datetime.now()))
+        .on_conflict_do_nothing(index_elements=["poll_id", "ip_address"])
+        .returning(PollVote.id)
+    )
+    inserted = db.execute(stmt).first() is not None
+    if inserted:
+        db.query(OpinionPollOption).filter(OpinionPollOption.id == option_id).update(
+            {OpinionPollOption.vote_count: OpinionPollOption.vote_count + 1}, synchronize_session=False)
+    db.commit()
+    return inserted
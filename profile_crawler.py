@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import asyncio
+import argparse
+from urllib.parse import urlsplit
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
+from eci_scraper import BASE_URL, HostRateLimiter, fetch_text
+from scrape_state import candidate_key
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+CANDIDATES_FILE = "eci_candidates.json"
+PROFILES_FILE = "eci_profiles.jsonl"
+
+PROFILE_WORKERS = 8
+PROFILE_RATE = 4.0
+
+# Profile labels (lower-cased, colon stripped) -> record field; first match wins
+PROFILE_FIELDS = [
+    (r"\bimmovable", "immovable_assets"),
+    (r"\bmovable", "movable_assets"),
+    (r"\btotal assets", "total_assets"),
+    (r"\bliabilit", "liabilities"),
+    (r"\bcriminal", "criminal_cases"),
+    (r"\beducation", "education"),
+    (r"\bfather", "relation_name"),
+    (r"\bhusband", "relation_name"),
+    (r"\bage\b", "age"),
+    (r"\bgender\b", "gender"),
+    (r"\baddress\b", "address"),
+]
+PROFILE_FIELDS = [(re.compile(pattern), field) for pattern, field in PROFILE_FIELDS]
+AMOUNT_FIELDS = {"immovable_assets", "movable_assets", "total_assets", "liabilities"}
+COUNT_FIELDS = {"criminal_cases", "age"}
+
+# ----------------------------
+# PROFILE PARSING
+# ----------------------------
+
+def profile_pairs(html):
+    """Label/value pairs from table rows, <p><strong>Label :</strong> value</p> and <dt>/<dd>."""
+    tree = LexborHTMLParser(html)
+    pairs = {}
+
+    for tr in tree.css("tr"):
+        cells = [td.text(separator=" ", strip=True) for td in tr.css("td, th")]
+        cells = [c for c in cells if c and c != ":"]
+        if len(cells) >= 2:
+            pairs.setdefault(cells[0].rstrip(" :"), cells[-1])
+
+    for p in tree.css("p"):
+        label_el = p.css_first("strong, b, label")
+        if label_el is None:
+            continue
+        label = label_el.text(strip=True)
+        value = p.text(separator=" ", strip=True)[len(label):].strip(" :")
+        if value:
+            pairs.setdefault(label.rstrip(" :"), value)
+
+    for dt in tree.css("dt"):
+        dd = dt.next
+        while dd is not None and dd.tag != "dd":
+            dd = dd.next
+        if dd is not None:
+            pairs.setdefault(dt.text(strip=True).rstrip(" :"), dd.text(separator=" ", strip=True))
+
+    return pairs
+
+
+def parse_amount(text):
+    # "Rs 1,23,45,678 ~ 1 Crore+" -> 12345678
+    m = re.search(r"\d[\d,]*", text.split("~")[0])
+    return int(m.group().replace(",", "")) if m else None
+
+
+def parse_count(text):
+    m = re.search(r"\d+", text)
+    if m:
+        return int(m.group())
+    # "No", "Nil", "None" for criminal cases
+    return 0 if text.strip().lower().startswith(("no", "nil")) else None
+
+
+def parse_profile(html):
+    pairs = profile_pairs(html)
+    profile = {}
+    for label, value in pairs.items():
+        lowered = label.lower()
+        for pattern, field in PROFILE_FIELDS:
+            if pattern.search(lowered):
+                break
+        else:
+            continue
+        if field in profile:
+            continue
+        if field in AMOUNT_FIELDS:
+            value = parse_amount(value)
+        elif field in COUNT_FIELDS:
+            value = parse_count(value)
+        profile[field] = value
+    profile["fields"] = pairs
+    return profile
+
+# ----------------------------
+# RESUMABLE STORE
+# ----------------------------
+
+def load_done(path):
+    """Keys of profiles already in the store; a torn last line from a crash is ignored."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def truncate_torn_tail(path):
+    """Cut a partial last line left by a crash so the next append starts on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < size:
+            f.truncate(pos)
+
+
+def profile_url(link, base_url=None):
+    # base_url redirects the crawl, e.g. to a local fixture_server.py
+    if not base_url:
+        return link
+    parts = urlsplit(link)
+    return base_url.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def save_profile_page(save_dir, url, html):
+    # Saved under the URL path so fixture_server.py can serve it back
+    path = os.path.join(save_dir, urlsplit(url).path.lstrip("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+# ----------------------------
+# CRAWLER
+# ----------------------------
+
+async def _crawl_profiles(pending, output, workers, rate, base_url, save_dir):
+    limiter = HostRateLimiter(rate)
+    semaphore = asyncio.Semaphore(workers)
+    queue = asyncio.Queue()
+    for c in pending:
+        queue.put_nowait(c)
+
+    timeout = aiohttp.ClientTimeout(total=60)
+    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"}
+    # One pooled connector: keep-alive connections are reused across profiles
+    connector = aiohttp.TCPConnector(limit=workers, limit_per_host=workers)
+    stats = {"done": 0, "failed": 0}
+
+    async with aiohttp.ClientSession(timeout=timeout, headers=headers, connector=connector) as session:
+        with open(output, "a", encoding="utf-8") as out:
+            async def worker():
+                while not queue.empty():
+                    c = queue.get_nowait()
+                    url = profile_url(c["view_more_link"], base_url)
+                    try:
+                        html = await fetch_text(session, url, limiter, semaphore)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        # Left out of the store, so the next run retries it
+                        print(f"Failed {c['name']}: {e}")
+                        stats["failed"] += 1
+                        continue
+                    if save_dir:
+                        save_profile_page(save_dir, url, html)
+                    record = {
+                        "key": candidate_key(c),
+                        **{k: c.get(k) for k in ("name", "party", "state", "constituency", "view_more_link")},
+                        "profile": parse_profile(html),
+                    }
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    stats["done"] += 1
+                    if stats["done"] % 50 == 0:
+                        print(f"Crawled {stats['done']}/{len(pending)} profiles...")
+
+            await asyncio.gather(*(worker() for _ in range(workers)))
+    return stats
+
+
+def crawl_profiles(candidates, output=PROFILES_FILE, workers=PROFILE_WORKERS, rate=PROFILE_RATE,
+                   base_url=None, save_dir=None):
+    """Fetch every candidate's view_more_link profile into the output NDJSON store.
+
+    Profiles already in the store are skipped, so an interrupted crawl resumes.
+    """
+    truncate_torn_tail(output)
+    done = load_done(output)
+    pending = [c for c in candidates
+               if c.get("view_more_link", "N/A") != "N/A" and candidate_key(c) not in done]
+    print(f"{len(done)} profiles already stored, {len(pending)} to crawl "
+          f"with {workers} workers at {rate}/s per host...")
+    if not pending:
+        return {"done": 0, "failed": 0}
+    return asyncio.run(_crawl_profiles(pending, output, workers, rate, base_url, save_dir))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl candidate affidavit profiles linked from the listing")
+    parser.add_argument("--candidates", default=CANDIDATES_FILE)
+    parser.add_argument("--output", default=PROFILES_FILE, help="NDJSON profile store, appended to and resumed from")
+    parser.add_argument("--workers", type=int, default=PROFILE_WORKERS)
+    parser.add_argument("--rate", type=float, default=PROFILE_RATE, help="max requests per second per host")
+    parser.add_argument("--base-url", help=f"fetch profiles from this host instead of {BASE_URL} "
+                                           "(e.g. a local fixture_server.py)")
+    parser.add_argument("--save-html", help="also save every profile page under this directory")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(args.candidates, encoding="utf-8") as f:
+        candidates = json.load(f)
+    stats = crawl_profiles(candidates, args.output, args.workers, args.rate, args.base_url, args.save_html)
+    print(f"SUCCESS: Stored {stats['done']} profiles to {args.output} ({stats['failed']} failed)")
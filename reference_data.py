@@ -0,0 +1,75 @@
+import threading
+from collections import namedtuple
+from itertools import chain
+from sqlalchemy import event
+from database import SessionLocal, Alliance, Party, Constituency
+
+# --- Immutable reference records ---
+# Plain tuples, not ORM objects: safe to share between reruns and sessions,
+# and nothing on them can trigger a lazy load.
+AllianceRef = namedtuple("AllianceRef", "id name name_ta election_type year")
+PartyRef = namedtuple("PartyRef", "id name name_ta alliance_id state category")
+ConstituencyRef = namedtuple("ConstituencyRef", "id state district district_ta name name_ta type")
+
+REFERENCE_MODELS = (Alliance, Party, Constituency)
+
+# --- Process-wide cache ---
+# Each entry is stored with the version it was loaded at; any committed write
+# to a reference model bumps the version, so the next read reloads.
+_lock = threading.Lock()
+_version = 0
+_cache = {}
+
+def reference_version():
+    return _version
+
+def bump_reference_version():
+    global _version
+    with _lock:
+        _version += 1
+
+def _cached(kind, load, db):
+    entry = _cache.get(kind)
+    if entry is not None and entry[0] == _version:
+        return entry[1]
+    version = _version
+    records = load(db)
+    with _lock:
+        # A write that landed while loading makes these records stale already
+        if version == _version:
+            _cache[kind] = (version, records)
+    return records
+
+def alliances(db):
+    return _cached("alliances", lambda db: tuple(
+        AllianceRef(a.id, a.name, a.name_ta, a.election_type, a.year)
+        for a in db.query(Alliance).order_by(Alliance.id)), db)
+
+def parties(db):
+    return _cached("parties", lambda db: tuple(
+        PartyRef(p.id, p.name, p.name_ta, p.alliance_id, p.state, p.category)
+        for p in db.query(Party).order_by(Party.id)), db)
+
+def constituencies(db):
+    return _cached("constituencies", lambda db: tuple(
+        ConstituencyRef(c.id, c.state, c.district, c.district_ta, c.name, c.name_ta, c.type)
+        for c in db.query(Constituency).order_by(Constituency.id)), db)
+
+def find_by_name(records, name):
+    return next((r for r in records if r.name == name), None)
+
+# --- Write-triggered invalidation ---
+@event.listens_for(SessionLocal, "after_flush")
+def _note_reference_writes(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    if any(isinstance(obj, REFERENCE_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["reference_changed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("reference_changed", False):
+        bump_reference_version()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("reference_changed", None)
@@ -0,0 +1,127 @@
+import os
+import csv
+import json
+import tempfile
+
+# ----------------------------
+# CHECKPOINTED ROLL JOB
+# ----------------------------
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def _atomic_write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RollJob:
+    """Appends each finished page to the output CSV and records it in a manifest.
+
+    The manifest (<output>.manifest.json) holds the pages committed so far and
+    the CSV size after the last commit. A page counts as done only once its
+    rows are fsynced and the manifest has been atomically replaced, so after a
+    crash the CSV is truncated back to the last committed size and the job
+    resumes with the remaining pages.
+    """
+
+    def __init__(self, output_csv, pages, fields, restart=False, source=None):
+        self.output_csv = output_csv
+        # The PDF or image directory the pages come from
+        self.source = source
+        self.manifest_path = output_csv + MANIFEST_SUFFIX
+        self.pages = list(pages)
+        self.fields = fields
+        self.done = set()
+        self.voters = 0
+        self.offset = 0
+        self.complete = False
+        self._file = None
+        self._writer = None
+
+        manifest = None if restart else self._load_manifest()
+        if manifest is not None:
+            self.done = set(manifest["done"])
+            self.voters = manifest["voters"]
+            self.offset = manifest["offset"]
+            self.complete = manifest.get("complete", False)
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path) or not os.path.exists(self.output_csv):
+            return None
+        with open(self.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        # A manifest for a different page list or column set belongs to another job
+        if manifest.get("pages") != self.pages or manifest.get("fields") != self.fields:
+            return None
+        return manifest
+
+    @property
+    def resumed(self):
+        return bool(self.done)
+
+    def pending(self):
+        return [p for p in self.pages if p not in self.done]
+
+    def open(self):
+        if self.resumed:
+            # Drop anything written after the last committed page
+            with open(self.output_csv, "r+b") as f:
+                f.truncate(self.offset)
+        else:
+            open(self.output_csv, "w").close()
+
+        # utf-8-sig only writes the BOM when the file is empty
+        self._file = open(self.output_csv, "a", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction="ignore",
+                                      lineterminator="\n")
+        if not self.resumed:
+            self._writer.writeheader()
+            self._sync()
+            self._save_manifest()
+        return self
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.offset = self._file.buffer.tell()
+
+    def _save_manifest(self):
+        _atomic_write_json(self.manifest_path, {
+            "pages": self.pages,
+            "fields": self.fields,
+            "done": [p for p in self.pages if p in self.done],
+            "voters": self.voters,
+            "offset": self.offset,
+            "complete": self.complete,
+        })
+
+    def committed_rows(self):
+        """Yield the rows of every page committed so far (call after open())."""
+        with open(self.output_csv, encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+
+    def commit(self, page, voters):
+        self._writer.writerows(voters)
+        self._sync()
+        self.done.add(page)
+        self.voters += len(voters)
+        self._save_manifest()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.complete = not self.pending()
+        self._save_manifest()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,203 @@
+import os
+import json
+import asyncio
+import argparse
+import tempfile
+from urllib.parse import urlsplit
+from eci_scraper import (BASE_URL, LISTING_PARAMS, ASYNC_RATE, HostRateLimiter, listing_session,
+                         scrape_listing_async, scrape_listing_playwright)
+from browser_pool import BrowserPool, POOL_SIZE
+from scrape_state import ScrapeState
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+JOBS_FILE = "scrape_jobs.json"
+SHARD_DIR = "eci_shards"
+OUTPUT_FILE = "eci_candidates.json"
+
+# Requests in flight across all jobs, and to any one host
+GLOBAL_CONCURRENCY = 8
+HOST_CONCURRENCY = 4
+
+# ----------------------------
+# JOB MATRIX
+# ----------------------------
+
+def load_jobs(path, elections=None, states=None):
+    """Expand the election matrix into one (election, state) job per listing.
+
+    Each entry: {"election": id, "name": ..., "year": ..., "states": [codes]}
+    """
+    with open(path, encoding="utf-8") as f:
+        matrix = json.load(f)
+    jobs = []
+    for entry in matrix:
+        if elections and entry["election"] not in elections:
+            continue
+        for state in entry["states"]:
+            if states and state not in states:
+                continue
+            jobs.append({"election": entry["election"], "name": entry["name"],
+                         "year": entry["year"], "state": state})
+    return jobs
+
+
+def job_label(job):
+    return f"{job['election']}/{job['state']}"
+
+
+def job_params(job):
+    return {**LISTING_PARAMS, "electionType": job["election"], "election": job["election"], "states": job["state"]}
+
+
+def job_metadata(job):
+    # years/Election are what the contestants page filters on
+    return {"years": job["year"], "Election": job["name"],
+            "election_id": job["election"], "state_code": job["state"]}
+
+
+def shard_path(out_dir, job):
+    return os.path.join(out_dir, job["election"], f"{job['state']}.json")
+
+
+def write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def merge_shards(jobs, out_dir, output):
+    """Combine every job's shard, including ones kept from earlier runs, into one file."""
+    merged = []
+    for job in jobs:
+        path = shard_path(out_dir, job)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                merged.extend(json.load(f))
+    write_json_atomic(output, merged)
+    return merged
+
+# ----------------------------
+# CONCURRENCY CAPS
+# ----------------------------
+
+class HostCaps:
+    """At most `total` requests in flight overall and `per_host` to any one host."""
+
+    def __init__(self, total=GLOBAL_CONCURRENCY, per_host=HOST_CONCURRENCY):
+        self.per_host = per_host
+        self._total = asyncio.Semaphore(total)
+        self._hosts = {}
+
+    def for_host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return _CapSlot(self._total, self._hosts[host])
+
+
+class _CapSlot:
+    # Used where the scrapers expect a semaphore: `async with slot:`
+    def __init__(self, total, host):
+        self._total = total
+        self._host = host
+
+    async def __aenter__(self):
+        # Host first, so a saturated host does not sit on global slots
+        await self._host.acquire()
+        await self._total.acquire()
+
+    async def __aexit__(self, *exc):
+        self._total.release()
+        self._host.release()
+
+# ----------------------------
+# SCHEDULER
+# ----------------------------
+
+async def _run_jobs(jobs, mode, base_url, caps, rate, out_dir, save_dir, incremental, pool_size):
+    async def run(job, scrape):
+        label = job_label(job)
+        path = shard_path(out_dir, job)
+        state = ScrapeState.load(path + ".state") if incremental else None
+        job_save_dir = os.path.join(save_dir, job["election"], job["state"]) if save_dir else None
+        try:
+            candidates = await scrape(job, state, job_save_dir)
+        except Exception as e:
+            # One failed listing should not take the rest of the matrix down
+            print(f"FAILED {label}: {e}")
+            return label, None
+        if candidates:
+            write_json_atomic(path, candidates)
+            if state is not None:
+                state.save()
+        print(f"{label}: {len(candidates)} candidates")
+        return label, len(candidates)
+
+    # One limiter for every job, so the per-host rate holds across the matrix
+    limiter = HostRateLimiter(rate)
+    if mode == "playwright":
+        # The pool size is the cap here: every render borrows one of its pages
+        async with BrowserPool(pool_size) as pool:
+            async def scrape(job, state, job_save_dir):
+                return await scrape_listing_playwright(pool, limiter, base_url, job_params(job), job_save_dir,
+                                                       state, job_metadata(job))
+            return await asyncio.gather(*(run(job, scrape) for job in jobs))
+
+    async with listing_session() as session:
+        async def scrape(job, state, job_save_dir):
+            return await scrape_listing_async(session, limiter, caps.for_host(base_url), caps.per_host,
+                                              base_url, job_params(job), job_save_dir, state, job_metadata(job))
+        return await asyncio.gather(*(run(job, scrape) for job in jobs))
+
+
+def run_jobs(jobs, mode="async", base_url=BASE_URL, total=GLOBAL_CONCURRENCY, per_host=HOST_CONCURRENCY,
+             rate=ASYNC_RATE, out_dir=SHARD_DIR, save_dir=None, incremental=False, pool_size=POOL_SIZE):
+    """Scrape every job concurrently; return {label: candidate count, or None if it failed}."""
+    print(f"Scheduling {len(jobs)} listings ({mode}, {total} requests overall, "
+          f"{per_host} per host, {rate}/s per host)...")
+    caps = HostCaps(total, per_host)
+    outcomes = asyncio.run(_run_jobs(jobs, mode, base_url, caps, rate, out_dir, save_dir,
+                                     incremental, pool_size))
+    return dict(outcomes)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape every (election, state) listing in a job matrix")
+    parser.add_argument("--jobs", default=JOBS_FILE, help="JSON election matrix")
+    parser.add_argument("--election", action="append", help="only this election id (repeatable)")
+    parser.add_argument("--state", action="append", help="only this state code (repeatable)")
+    parser.add_argument("--mode", choices=["async", "playwright"], default="async")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=GLOBAL_CONCURRENCY, help="requests in flight overall")
+    parser.add_argument("--host-concurrency", type=int, default=HOST_CONCURRENCY,
+                        help="requests in flight to any one host")
+    parser.add_argument("--rate", type=float, default=ASYNC_RATE, help="max requests per second per host")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="browser contexts for --mode playwright")
+    parser.add_argument("--shard-dir", default=SHARD_DIR, help="one <election>/<state>.json per job")
+    parser.add_argument("--save-html", help="also save listing HTML under DIR/<election>/<state>/")
+    parser.add_argument("--incremental", action="store_true", help="keep per-shard state between runs")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="all shards merged")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    jobs = load_jobs(args.jobs, args.election, args.state)
+    if not jobs:
+        print(f"FAILED: No jobs selected from {args.jobs}")
+    else:
+        outcomes = run_jobs(jobs, args.mode, args.base_url, args.concurrency, args.host_concurrency, args.rate,
+                            args.shard_dir, args.save_html, args.incremental, args.pool_size)
+        failed = [label for label, count in outcomes.items() if count is None]
+        # Merge the whole matrix, not just the jobs selected for this run, so
+        # re-running one state keeps every other state's shard in the output
+        merged = merge_shards(load_jobs(args.jobs), args.shard_dir, args.output)
+        print(f"SUCCESS: Saved {len(merged)} candidates from {len(jobs) - len(failed)}/{len(jobs)} "
+              f"listings to {args.output}")
+        if failed:
+            print(f"Failed listings (re-run to retry): {', '.join(failed)}")
@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+STATE_FILE = "eci_scrape_state.json"
+DELTA_FILE = "eci_candidates_delta.json"
+
+# Parts of a listing page that change on every request without the listing
+# changing: Laravel-encrypted show-profile tokens (fresh IV per render) and
+# CSRF tokens
+VOLATILE = re.compile(
+    r"eyJpdiI6[A-Za-z0-9+/=%_\-]+"
+    r"|(name=[\"'](?:_token|csrf-token)[\"'][^>]*?(?:value|content)=)[\"'][^\"']*[\"']"
+)
+
+# ----------------------------
+# FINGERPRINTS AND KEYS
+# ----------------------------
+
+def page_fingerprint(html):
+    normalized = VOLATILE.sub(lambda m: m.group(1) or "", html)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def candidate_key(c):
+    # view_more_link is re-encrypted on every render, so it cannot identify a candidate
+    return "|".join(c.get(f, "") for f in ("state", "constituency", "party", "name"))
+
+
+def candidate_index(candidates):
+    return {candidate_key(c): c for c in candidates}
+
+
+def diff_candidates(old_index, new_index):
+    """Return the added, removed and status-changed candidates between two runs."""
+    return {
+        "added": [new_index[k] for k in new_index if k not in old_index],
+        "removed": [old_index[k] for k in old_index if k not in new_index],
+        "status_changed": [
+            {**new_index[k], "previous_status": old_index[k].get("status")}
+            for k in new_index
+            if k in old_index and new_index[k].get("status") != old_index[k].get("status")
+        ],
+    }
+
+# ----------------------------
+# PERSISTED SCRAPE STATE
+# ----------------------------
+
+class ScrapeState:
+    """Per-page validators and candidates from the previous run.
+
+    A page answered with 304, or whose fingerprint matches the stored one,
+    reuses its stored candidates instead of being parsed again.
+    """
+
+    def __init__(self, path=STATE_FILE, pages=None, last_page=None):
+        self.path = path
+        self.pages = pages or {}
+        self.last_page = last_page
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, data.get("pages"), data.get("last_page"))
+
+    def save(self):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"last_page": self.last_page, "pages": self.pages}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def conditional_headers(self, page_num):
+        page = self.pages.get(str(page_num))
+        headers = {}
+        if page and page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page and page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def page_unchanged(self, page_num, fingerprint):
+        page = self.pages.get(str(page_num))
+        return page is not None and page["fingerprint"] == fingerprint
+
+    def page_candidates(self, page_num):
+        page = self.pages.get(str(page_num))
+        return page["candidates"] if page else None
+
+    def record_page(self, page_num, fingerprint, candidates, etag=None, last_modified=None):
+        self.pages[str(page_num)] = {
+            "fingerprint": fingerprint,
+            "etag": etag,
+            "last_modified": last_modified,
+            "candidates": candidates,
+        }
+
+    def candidate_index(self):
+        return candidate_index(c for page in self.pages.values() for c in page["candidates"] or [])
+
+    def trim(self, last_page):
+        # Pages past the end of the listing no longer exist
+        self.last_page = last_page
+        self.pages = {n: p for n, p in self.pages.items() if int(n) <= last_page}
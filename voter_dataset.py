@@ -0,0 +1,152 @@
+import os
+import re
+import hashlib
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+
+# Rows buffered per partition before they are flushed as one row group
+ROW_GROUP_SIZE = 50_000
+
+VOTER_SCHEMA = pa.schema([
+    ("voter_id", pa.string()),
+    ("name", pa.string()),
+    ("relation", pa.string()),
+    ("house_no", pa.string()),
+    ("age", pa.int8()),
+    ("gender", pa.dictionary(pa.int8(), pa.string())),
+    ("source", pa.string()),
+    # Grid position of the voter's box on the page; null unless --segment found one
+    ("box_row", pa.int16()),
+    ("box_col", pa.int16()),
+])
+
+# ----------------------------
+# PARTITIONED PARQUET WRITER
+# ----------------------------
+
+# source_stem() appends "-<8 hex digits>" of the source path to output names
+STEM_HASH = re.compile(r"-[0-9a-f]{8}$")
+
+
+def part_number(source):
+    # Roll PDFs end in "...-TAM-<part>-WI.pdf"; the part is the last number in
+    # the name, once any source_stem() hash has been dropped from outputs
+    stem = STEM_HASH.sub("", os.path.splitext(os.path.basename(source))[0])
+    numbers = re.findall(r"\d+", stem)
+    return numbers[-1] if numbers else "unknown"
+
+
+def source_stem(source):
+    """File stem for a source's outputs: its name plus a hash of its full path.
+
+    Rolls with the same file name from different directories (one per
+    constituency, say) would otherwise overwrite each other's outputs.
+    """
+    path = os.path.abspath(source).rstrip("/")
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+
+
+def _to_age(value):
+    try:
+        age = int(value)
+    except (TypeError, ValueError):
+        return None
+    return age if 0 <= age <= 127 else None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_category(values):
+    categories = sorted({v for v in values if v is not None})
+    codes = {v: i for i, v in enumerate(categories)}
+    return pa.DictionaryArray.from_arrays(
+        pa.array([codes.get(v) for v in values], pa.int8()),
+        pa.array(categories, pa.string()),
+    )
+
+
+class VoterDatasetWriter:
+    """Writes voters as a hive-partitioned Parquet dataset, one file per source PDF.
+
+    Layout is <root>/part=<part number>/<source_stem>.parquet. Rows are buffered
+    per source and flushed as a row group every ROW_GROUP_SIZE rows, so memory
+    stays flat however large the run is.
+    """
+
+    def __init__(self, root, row_group_size=ROW_GROUP_SIZE):
+        self.root = root
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writers = {}
+        self._buffers = {}
+
+    def _writer(self, source):
+        writer = self._writers.get(source)
+        if writer is None:
+            part_dir = os.path.join(self.root, f"part={part_number(source)}")
+            os.makedirs(part_dir, exist_ok=True)
+            writer = pq.ParquetWriter(os.path.join(part_dir, f"{source_stem(source)}.parquet"), VOTER_SCHEMA)
+            self._writers[source] = writer
+            self._buffers[source] = []
+        return writer
+
+    def write(self, source, voters):
+        self._writer(source)
+        buffer = self._buffers[source]
+        buffer.extend(voters)
+        if len(buffer) >= self.row_group_size:
+            self._flush(source)
+
+    def _flush(self, source):
+        buffer = self._buffers[source]
+        if not buffer:
+            return
+        name = os.path.basename(source.rstrip("/"))
+        table = pa.table({
+            "voter_id": pa.array([v.get("voter_id") for v in buffer], pa.string()),
+            "name": pa.array([v.get("name") or None for v in buffer], pa.string()),
+            "relation": pa.array([v.get("relation") or None for v in buffer], pa.string()),
+            "house_no": pa.array([v.get("house_no") or None for v in buffer], pa.string()),
+            "age": pa.array([_to_age(v.get("age")) for v in buffer], pa.int8()),
+            "gender": _to_category([v.get("gender") or None for v in buffer]),
+            "source": pa.array([name] * len(buffer), pa.string()),
+            "box_row": pa.array([_to_int(v.get("box_row")) for v in buffer], pa.int16()),
+            "box_col": pa.array([_to_int(v.get("box_col")) for v in buffer], pa.int16()),
+        }, schema=VOTER_SCHEMA)
+        self._writers[source].write_table(table, row_group_size=self.row_group_size)
+        self.rows += len(buffer)
+        self._buffers[source] = []
+
+    def close_source(self, source):
+        """Flush, close and fsync the source's file, so it is durable once this returns."""
+        if source not in self._writers:
+            return
+        self._flush(source)
+        writer = self._writers.pop(source)
+        writer.close()
+        self._buffers.pop(source)
+        fd = os.open(writer.where, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        for source in list(self._writers):
+            self.close_source(source)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()